@@ -0,0 +1,323 @@
+import copy
+import queue
+import threading
+import time
+from typing import Callable, NamedTuple, Protocol
+from model import GameModel
+from project_types import Action, ActionKind, PieceID, Team
+from bitboard import CAPTURED_SLOTS, bit
+
+
+WIN_SCORE = 100_000
+INFINITY = 10 * WIN_SCORE
+
+PIECE_VALUES: dict[PieceID, int] = {
+    PieceID.GOBLIN: 100,
+    PieceID.SLIME: 80,
+    PieceID.CENTAUR: 300,
+    PieceID.DRAGON: 450,
+    PieceID.SUMMONER: 0,
+}
+CAPTURED_WEIGHT = 0.8  # A captured piece still has to be dropped back in
+SUMMONER_FREEDOM = 60  # Per empty cell next to a summoner
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class ComputerPlayer(Protocol):
+    def choose(self, model: GameModel) -> Action | None: ...
+
+
+class BackgroundPlayer:
+    def __init__(
+        self, ai: ComputerPlayer, wakeup: Callable[[], None] | None = None
+    ):
+        """
+        Runs a ComputerPlayer on a worker thread so its search never
+        blocks the render loop. The chosen action comes back through a
+        queue; wakeup is called from the worker when one is ready.
+        """
+        self._ai = ai
+        self._wakeup = wakeup
+        self._requests: queue.Queue[tuple[int, GameModel]] = queue.Queue()
+        self._results: queue.Queue[tuple[int, Action]] = queue.Queue()
+        self._generation = 0
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def start(self, model: GameModel):
+        """
+        Chooses an action for a copy of model, dropping any earlier request
+        """
+        self.cancel()
+        self._requests.put((self._generation, copy.deepcopy(model)))
+
+    def cancel(self):
+        """
+        Results of earlier requests become stale
+        """
+        self._generation += 1
+
+    def poll(self) -> Action | None:
+        """
+        Action chosen for the latest request, if it is ready
+        """
+        latest = None
+        while True:
+            try:
+                generation, action = self._results.get_nowait()
+            except queue.Empty:
+                return latest
+            if generation == self._generation:
+                latest = action
+
+    def _work(self):
+        while True:
+            generation, model = self._requests.get()
+            if generation != self._generation:
+                continue  # Superseded while queued
+            action = self._ai.choose(model)
+            if action is None:
+                continue
+            self._results.put((generation, action))
+            if self._wakeup is not None:
+                self._wakeup()
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchResult(NamedTuple):
+    action: Action | None
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    score: int
+    flag: int
+    action: Action | None
+
+
+class AlphaBetaAI:
+    def __init__(
+        self,
+        time_budget: float = 0.3,
+        max_depth: int = 32,
+        tt_capacity: int = 200_000,
+    ):
+        """
+        Iterative-deepening alpha-beta over single actions.
+        A player keeps the move while moves_left lasts, so a ply only
+        flips the score when curr_player actually changes.
+        """
+        self._time_budget = time_budget
+        self._max_depth = max_depth
+        self._tt_capacity = tt_capacity
+        self._tt: dict[int, TTEntry] = {}
+        self._model = GameModel()
+        self._deadline = 0.0
+        self._nodes = 0
+        self._should_stop: Callable[[], bool] | None = None
+        self._root_action: Action | None = None
+
+    def choose(self, model: GameModel) -> Action | None:
+        return self.search(model).action
+
+    def search(
+        self,
+        model: GameModel,
+        on_depth: Callable[[SearchResult], None] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> SearchResult:
+        """
+        Searches a private copy of model until the time budget runs out,
+        should_stop() returns True or a forced result is found.
+        on_depth is called with the best result of every finished depth.
+        """
+        start = time.perf_counter()
+        self._model = copy.deepcopy(model)
+        self._deadline = start + self._time_budget
+        self._nodes = 0
+        self._should_stop = should_stop
+        if len(self._tt) > self._tt_capacity:
+            self._tt.clear()
+
+        actions = self._model.legal_actions()
+        if not actions:
+            return SearchResult(None, 0, 0, 0, time.perf_counter() - start)
+        best = SearchResult(actions[0], 0, 0, 0, 0.0)
+
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score = self._alphabeta(depth, -INFINITY, INFINITY, 0)
+            except SearchTimeout:
+                break
+            best = SearchResult(
+                self._root_action,
+                score,
+                depth,
+                self._nodes,
+                time.perf_counter() - start,
+            )
+            if on_depth is not None:
+                on_depth(best)
+            if abs(score) >= WIN_SCORE - self._max_depth:
+                break  # Forced win or loss, deeper search changes nothing
+
+        return best._replace(nodes=self._nodes, elapsed=time.perf_counter() - start)
+
+    def _check_time(self):
+        if time.perf_counter() > self._deadline:
+            raise SearchTimeout
+        if self._should_stop is not None and self._should_stop():
+            raise SearchTimeout
+
+    def _alphabeta(self, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """
+        Score of the position for its curr_player
+        """
+        self._nodes += 1
+        if self._nodes & 511 == 0:
+            self._check_time()
+
+        model = self._model
+        state = model.state
+        if state.winner is not None:
+            if state.winner == Team.Neutral:
+                return 0
+            if state.winner == state.curr_player:
+                return WIN_SCORE - ply
+            return ply - WIN_SCORE
+        if depth == 0:
+            return self._evaluate()
+
+        key = model.zobrist_key
+        entry = self._tt.get(key)
+        tt_action = None
+        if entry is not None:
+            tt_action = entry.action
+            if entry.depth >= depth and ply > 0:
+                score = self._from_tt(entry.score, ply)
+                if entry.flag == EXACT:
+                    return score
+                if entry.flag == LOWER and score >= beta:
+                    return score
+                if entry.flag == UPPER and score <= alpha:
+                    return score
+
+        alpha_start = alpha
+        best_score = -INFINITY
+        best_action: Action | None = None
+        player = state.curr_player
+        for action in self._ordered(model.legal_actions(), tt_action):
+            record = model.make(action)
+            if state.curr_player == player:
+                score = self._alphabeta(depth - 1, alpha, beta, ply + 1)
+            else:
+                score = -self._alphabeta(depth - 1, -beta, -alpha, ply + 1)
+            model.unmake(record)
+
+            if score > best_score:
+                best_score = score
+                best_action = action
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_start:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._tt[key] = TTEntry(
+            depth, self._to_tt(best_score, ply), flag, best_action
+        )
+        if ply == 0:
+            self._root_action = best_action
+        return best_score
+
+    def _to_tt(self, score: int, ply: int) -> int:
+        """
+        Mate scores count plies from the root of the search; the table
+        outlives it, so stored ones count from the position instead
+        """
+        if score >= WIN_SCORE - self._max_depth:
+            return score + ply
+        if score <= self._max_depth - WIN_SCORE:
+            return score - ply
+        return score
+
+    def _from_tt(self, score: int, ply: int) -> int:
+        """
+        Stored mate score counted from the root of the current search
+        """
+        if score >= WIN_SCORE - self._max_depth:
+            return score - ply
+        if score <= self._max_depth - WIN_SCORE:
+            return score + ply
+        return score
+
+    def _ordered(self, actions: list[Action], tt_action: Action | None) -> list[Action]:
+        """
+        Best move of a previous search first, then captures of the most
+        valuable pieces, then moves closing in on enemy summoners
+        """
+        model = self._model
+        board = model.state.board_state
+        bitboards = model.bitboards
+        opponent = (
+            Team.Player2 if model.state.curr_player == Team.Player1 else Team.Player1
+        )
+        cage = bitboards.summoner_adjacent(opponent)
+
+        def priority(action: Action) -> int:
+            if action == tt_action:
+                return -INFINITY
+            if action.kind == ActionKind.CAPTURE:
+                victim = board[action.toi][action.toj]
+                assert victim is not None
+                return -1000 - PIECE_VALUES[victim.pieceid]
+            if bit(action.toi, action.toj) & cage:
+                return -500
+            return 0
+
+        return sorted(actions, key=priority)
+
+    def _evaluate(self) -> int:
+        """
+        Material on the board and in the captured grid,
+        plus room left around each side's summoners
+        """
+        model = self._model
+        bitboards = model.bitboards
+        team = model.state.curr_player
+        opponent = Team.Player2 if team == Team.Player1 else Team.Player1
+        own = bitboards.teams[team]
+        other = bitboards.teams[opponent]
+
+        score = 0
+        for pieceid, value in PIECE_VALUES.items():
+            mask = bitboards.pieces[pieceid]
+            score += value * ((mask & own).bit_count() - (mask & other).bit_count())
+        for slot in range(CAPTURED_SLOTS):
+            own_captured = bitboards.captured_at(team, slot)
+            if own_captured is not None:
+                score += int(PIECE_VALUES[own_captured] * CAPTURED_WEIGHT)
+            other_captured = bitboards.captured_at(opponent, slot)
+            if other_captured is not None:
+                score -= int(PIECE_VALUES[other_captured] * CAPTURED_WEIGHT)
+
+        empty = bitboards.empty()
+        own_freedom = (bitboards.summoner_adjacent(team) & empty).bit_count()
+        other_freedom = (bitboards.summoner_adjacent(opponent) & empty).bit_count()
+        score += SUMMONER_FREEDOM * (own_freedom - other_freedom)
+        return score
@@ -0,0 +1,143 @@
+import pygame
+from collections import OrderedDict
+from project_types import PieceID, Team, PIECE_ICON_PATHS
+
+
+class SpriteCache:
+    def __init__(self, size: tuple[int, int]):
+        """
+        Loads every piece icon once and keeps a copy scaled to size.
+        Needs the display mode to be set beforehand for convert_alpha().
+        """
+        self._size = size
+        self._originals: dict[PieceID, pygame.Surface] = {}
+        self._scaled: dict[PieceID, pygame.Surface] = {}
+        self._load()
+        self._rebuild()
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    def _load(self):
+        for pieceid, path in PIECE_ICON_PATHS.items():
+            self._originals[pieceid] = pygame.image.load(path).convert_alpha()
+
+    def _rebuild(self):
+        self._scaled = {
+            pieceid: pygame.transform.scale(image, self._size)
+            for pieceid, image in self._originals.items()
+        }
+
+    def resize(self, size: tuple[int, int]):
+        """
+        Rescales the cached icons, only when the size actually changed
+        """
+        if size == self._size:
+            return
+        self._size = size
+        self._rebuild()
+
+    def get(self, pieceid: PieceID) -> pygame.Surface:
+        return self._scaled[pieceid]
+
+
+class TokenAtlas:
+    def __init__(
+        self,
+        sprites: SpriteCache,
+        box_size: tuple[int, int],
+        team_colors: dict[Team, str],
+    ):
+        """
+        Holds every PieceID and Team combination on a single surface,
+        with the team circle and icon already composited.
+        One row per team, one column per PieceID.
+        """
+        self._sprites = sprites
+        self._box_size = box_size
+        self._team_colors = team_colors
+        self._columns = {pieceid: col for col, pieceid in enumerate(PieceID)}
+        self._rows = {team: row for row, team in enumerate(team_colors)}
+        self._surface = pygame.Surface((0, 0))
+        self._regions: dict[tuple[PieceID, Team], pygame.Rect] = {}
+        self._rebuild()
+
+    @property
+    def surface(self) -> pygame.Surface:
+        return self._surface
+
+    def _rebuild(self):
+        xlen, ylen = self._box_size
+        surface = pygame.Surface(
+            (xlen * len(self._columns), ylen * len(self._rows)), pygame.SRCALPHA
+        )
+        self._regions = {}
+
+        icon_xlen, icon_ylen = self._sprites.size
+        icon_offset = ((xlen - icon_xlen) // 2, (ylen - icon_ylen) // 2)
+        radius = min(xlen, ylen) // 2 - 4
+        for team, row in self._rows.items():
+            for pieceid, col in self._columns.items():
+                region = pygame.Rect(col * xlen, row * ylen, xlen, ylen)
+                pygame.draw.circle(
+                    surface, self._team_colors[team], region.center, radius
+                )
+                surface.blit(
+                    self._sprites.get(pieceid),
+                    (region.x + icon_offset[0], region.y + icon_offset[1]),
+                )
+                self._regions[(pieceid, team)] = region
+        # Composited once, then blitted every frame in the display's format
+        self._surface = surface.convert_alpha()
+
+    def resize(self, box_size: tuple[int, int]):
+        """
+        Rebuilds the atlas from the sprite cache when the box size changes
+        """
+        if box_size == self._box_size:
+            return
+        self._box_size = box_size
+        self._rebuild()
+
+    def region(self, pieceid: PieceID, team: Team) -> pygame.Rect:
+        return self._regions[(pieceid, team)]
+
+    def blit(
+        self, target: pygame.Surface, pos: tuple[int, int], pieceid: PieceID, team: Team
+    ):
+        target.blit(self._surface, pos, self._regions[(pieceid, team)])
+
+
+class TextCache:
+    def __init__(self, fontname: str = "", maxsize: int = 64):
+        """
+        Keeps font objects alive and memoizes rendered text surfaces
+        keyed by (text, size, color), evicting the least recently used.
+        """
+        self._fontname = fontname
+        self._maxsize = maxsize
+        self._fonts: dict[int, pygame.font.Font] = {}
+        self._rendered: OrderedDict[tuple[str, int, str], pygame.Surface] = (
+            OrderedDict()
+        )
+
+    def font(self, size: int) -> pygame.font.Font:
+        font = self._fonts.get(size)
+        if font is None:
+            font = pygame.font.SysFont(self._fontname, size)
+            self._fonts[size] = font
+        return font
+
+    def render(self, text: str, size: int, color: str) -> pygame.Surface:
+        key = (text, size, color)
+        surface = self._rendered.get(key)
+        if surface is not None:
+            self._rendered.move_to_end(key)
+            return surface
+
+        surface = self.font(size).render(text, True, color)
+        self._rendered[key] = surface
+        if len(self._rendered) > self._maxsize:
+            self._rendered.popitem(last=False)
+        return surface
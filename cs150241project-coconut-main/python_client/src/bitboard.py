@@ -0,0 +1,267 @@
+from typing import Iterable, Iterator
+from project_types import Piece, PieceID, Team
+
+
+BOARD_ROWS = 5
+BOARD_COLS = 5  # Specifications
+CAPTURED_SLOTS = 3
+FULL_BOARD = (1 << (BOARD_ROWS * BOARD_COLS)) - 1
+
+SLOT_BITS = 3
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+PIECE_CODES: dict[PieceID, int] = {
+    PieceID.GOBLIN: 1,
+    PieceID.DRAGON: 2,
+    PieceID.SLIME: 3,
+    PieceID.SUMMONER: 4,
+    PieceID.CENTAUR: 5,
+}
+CODE_PIECES: dict[int, PieceID] = {code: pid for pid, code in PIECE_CODES.items()}
+
+
+def square(i: int, j: int) -> int:
+    return i * BOARD_COLS + j
+
+
+def bit(i: int, j: int) -> int:
+    return 1 << (i * BOARD_COLS + j)
+
+
+def on_board(i: int, j: int) -> bool:
+    return 0 <= i < BOARD_ROWS and 0 <= j < BOARD_COLS
+
+
+def cells(mask: int) -> list[tuple[int, int]]:
+    """
+    Board coordinates of every set bit, in row-major order
+    """
+    result: list[tuple[int, int]] = []
+    while mask:
+        low = mask & -mask
+        result.append(divmod(low.bit_length() - 1, BOARD_COLS))
+        mask ^= low
+    return result
+
+
+class MoveSet:
+    """
+    Immutable set of board cells backed by a bitmask: membership is a bit
+    test and iteration yields the cells in row-major order
+    """
+
+    __slots__ = ("_mask",)
+
+    def __init__(self, mask: int = 0):
+        self._mask = mask
+
+    @classmethod
+    def of(cls, coords: Iterable[tuple[int, int]]) -> "MoveSet":
+        mask = 0
+        for i, j in coords:
+            mask |= bit(i, j)
+        return cls(mask)
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        i, j = cell
+        return on_board(i, j) and bool(self._mask & bit(i, j))
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return iter(cells(self._mask))
+
+    def __len__(self) -> int:
+        return self._mask.bit_count()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, MoveSet) and other._mask == self._mask
+
+    def __hash__(self) -> int:
+        return hash(self._mask)
+
+    def __repr__(self) -> str:
+        return f"MoveSet({cells(self._mask)})"
+
+
+ORTHOGONAL = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+ORTHOGONAL_TWO = [
+    (0, -2),
+    (0, -1),
+    (0, 1),
+    (0, 2),
+    (-2, 0),
+    (-1, 0),
+    (1, 0),
+    (2, 0),
+]
+DIAGONAL = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+MOVEMENTS: dict[tuple[PieceID, Team], list[tuple[int, int]]] = {}
+for _team in (Team.Player1, Team.Player2):
+    MOVEMENTS[(PieceID.GOBLIN, _team)] = ORTHOGONAL
+    MOVEMENTS[(PieceID.SUMMONER, _team)] = ORTHOGONAL
+    MOVEMENTS[(PieceID.CENTAUR, _team)] = ORTHOGONAL_TWO
+    MOVEMENTS[(PieceID.DRAGON, _team)] = ORTHOGONAL_TWO + DIAGONAL
+MOVEMENTS[(PieceID.SLIME, Team.Player1)] = [(1, 0)]
+MOVEMENTS[(PieceID.SLIME, Team.Player2)] = [(-1, 0)]
+
+# (target bit, bit that must be empty to reach it or 0, target cell)
+MoveEntry = tuple[int, int, tuple[int, int]]
+
+
+def _build_move_table(movement: list[tuple[int, int]]) -> list[list[MoveEntry]]:
+    """
+    On-board targets of a movement from every square,
+    with the square jumped over by 2-step moves
+    """
+    table: list[list[MoveEntry]] = []
+    for i in range(BOARD_ROWS):
+        for j in range(BOARD_COLS):
+            entries: list[MoveEntry] = []
+            for di, dj in movement:
+                ti, tj = i + di, j + dj
+                if not on_board(ti, tj):
+                    continue
+                if abs(di) == 2 or abs(dj) == 2:
+                    blocker = bit(i + di // 2, j + dj // 2)
+                else:
+                    blocker = 0
+                entries.append((bit(ti, tj), blocker, (ti, tj)))
+            table.append(entries)
+    return table
+
+
+MOVE_TABLES: dict[tuple[PieceID, Team], list[list[MoveEntry]]] = {
+    key: _build_move_table(movement) for key, movement in MOVEMENTS.items()
+}
+MOVE_MASKS: dict[tuple[PieceID, Team], list[int]] = {
+    key: [sum(entry[0] for entry in entries) for entries in table]
+    for key, table in MOVE_TABLES.items()
+}
+NEIGHBORS = MOVE_MASKS[(PieceID.SUMMONER, Team.Player1)]
+
+
+class Bitboards:
+    def __init__(self):
+        """
+        Integer bitboards of the board: one occupancy mask per team and
+        one per PieceID, bit i * 5 + j standing for board cell (i, j).
+        Each captured grid is packed as SLOT_BITS bits per slot holding
+        a PIECE_CODES value, 0 when empty. Captured pieces always belong
+        to the grid's owner so their team is not stored.
+        The cells next to each team's summoners are kept up to date as
+        summoners are placed and removed, so mobility checks and
+        forbidden drops are a couple of mask operations.
+        """
+        self.teams: dict[Team, int] = {Team.Player1: 0, Team.Player2: 0}
+        self.pieces: dict[PieceID, int] = {pieceid: 0 for pieceid in PieceID}
+        self.captured: dict[Team, int] = {Team.Player1: 0, Team.Player2: 0}
+        self._adjacent: dict[Team, int] = {Team.Player1: 0, Team.Player2: 0}
+
+    @classmethod
+    def from_grids(
+        cls,
+        board: list[list[Piece | None]],
+        captured1: list[list[Piece | None]],
+        captured2: list[list[Piece | None]],
+    ) -> "Bitboards":
+        bitboards = cls()
+        for i, row in enumerate(board):
+            for j, piece in enumerate(row):
+                if piece is not None:
+                    bitboards.place(i, j, piece.pieceid, piece.team)
+        for team, grid in ((Team.Player1, captured1), (Team.Player2, captured2)):
+            for slot, piece in enumerate(grid[0]):
+                if piece is not None:
+                    bitboards.set_captured(team, slot, piece.pieceid)
+        return bitboards
+
+    def place(self, i: int, j: int, pieceid: PieceID, team: Team):
+        b = bit(i, j)
+        self.teams[team] |= b
+        self.pieces[pieceid] |= b
+        if pieceid == PieceID.SUMMONER:
+            self._refresh_adjacent(team)
+
+    def remove(self, i: int, j: int, pieceid: PieceID, team: Team):
+        b = ~bit(i, j)
+        self.teams[team] &= b
+        self.pieces[pieceid] &= b
+        if pieceid == PieceID.SUMMONER:
+            self._refresh_adjacent(team)
+
+    def _refresh_adjacent(self, team: Team):
+        """
+        Only runs when a summoner of the team moves, at most two lookups
+        """
+        summoners = self.pieces[PieceID.SUMMONER] & self.teams[team]
+        mask = 0
+        while summoners:
+            low = summoners & -summoners
+            mask |= NEIGHBORS[low.bit_length() - 1]
+            summoners ^= low
+        self._adjacent[team] = mask
+
+    def set_captured(self, team: Team, slot: int, pieceid: PieceID | None):
+        shift = slot * SLOT_BITS
+        code = PIECE_CODES[pieceid] if pieceid is not None else 0
+        packed = self.captured[team] & ~(SLOT_MASK << shift)
+        self.captured[team] = packed | (code << shift)
+
+    def captured_at(self, team: Team, slot: int) -> PieceID | None:
+        code = (self.captured[team] >> (slot * SLOT_BITS)) & SLOT_MASK
+        return CODE_PIECES.get(code)
+
+    def captured_full(self, team: Team) -> bool:
+        packed = self.captured[team]
+        for slot in range(CAPTURED_SLOTS):
+            if not (packed >> (slot * SLOT_BITS)) & SLOT_MASK:
+                return False
+        return True
+
+    def occupied(self) -> int:
+        return self.teams[Team.Player1] | self.teams[Team.Player2]
+
+    def empty(self) -> int:
+        return ~self.occupied() & FULL_BOARD
+
+    def summoner_adjacent(self, team: Team | None = None) -> int:
+        """
+        Cells next to a summoner, of one team or of both when team is None
+        """
+        if team is not None:
+            return self._adjacent[team]
+        return self._adjacent[Team.Player1] | self._adjacent[Team.Player2]
+
+    def drop_targets(self) -> int:
+        """
+        Empty cells a captured piece may be dropped on
+        """
+        return self.empty() & ~self.summoner_adjacent()
+
+    def piece_moves(self, i: int, j: int, pieceid: PieceID, team: Team) -> int:
+        """
+        Bitmask of the legal board targets of a board piece: a table lookup
+        filtered by occupancy, capture rules and jumps
+        """
+        occupied = self.occupied()
+        blocked = self.teams[team]  # Cannot capture these
+        if pieceid == PieceID.SUMMONER or self.captured_full(team):
+            blocked |= occupied
+        else:
+            blocked |= self.pieces[PieceID.SUMMONER]
+
+        mask = 0
+        for target, blocker, _ in MOVE_TABLES[(pieceid, team)][square(i, j)]:
+            if not target & blocked and not blocker & occupied:
+                mask |= target
+        return mask
+
+    def summoner_mobile(self, team: Team) -> bool:
+        """
+        A summoner of the team has an empty cell to step into
+        """
+        return bool(self._adjacent[team] & ~self.occupied())
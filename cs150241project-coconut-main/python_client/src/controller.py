@@ -1,42 +1,311 @@
+from collections import deque
+from typing import NamedTuple
 from view import GameView
-from model import GameModel
-from project_types import GameStateProtocol, GameStateChangeObserver, Location
+from model import GameModel, UndoRecord
+from ai import BackgroundPlayer, ComputerPlayer
+from hints import HintAnalyzer
+from wire import CHECKSUM_MASK, TEXT_PREFIX, state_reply
+from project_types import (
+    Action,
+    GameSnapshot,
+    GameStateChangeObserver,
+    Location,
+    Team,
+)
+
+
+class PendingAction(NamedTuple):
+    """
+    Local action applied ahead of its echo
+    """
+
+    seq: int
+    action: Action
+    record: UndoRecord
+
+
+class HeldAction(NamedTuple):
+    """
+    Received action waiting for the reply to our state request
+    """
+
+    action: Action
+    sender: Team | None
+    seq: int
+    checksum: int
+
+
+MOVES_PER_TURN = 3  # Specifications
 
 
 class GameController:
-    def __init__(self, model: GameModel, view: GameView):
+    def __init__(
+        self, model: GameModel, view: GameView, ai: ComputerPlayer | None = None
+    ):
         self._model = model
         self._view = view
+        self._ai = BackgroundPlayer(ai, wakeup=view.wake) if ai else None
+        self._ai_waiting = False
+        self._ai_key: int | None = None  # State the computer is searching
+        self._pending: deque[PendingAction] = deque()
+        self._next_seq = 0
+        self._requests_out = 0  # State requests without a reply yet
+        self._holding = False
+        self._held: list[HeldAction] = []
+        self._hints = HintAnalyzer(wakeup=view.wake)
+        self._hints_enabled = False
+        self._hint_key: int | None = None  # State the hints are analyzing
         self._game_state_change_observers: list[GameStateChangeObserver] = []
 
     def start(self):
         view = self._view
         self.register_game_state_change_observer(view)
         view.register_on_click_observer(self)
+        view.register_action_observer(self)
         view.register_game_state_initialize_observer(self)
+        view.register_hint_observer(self)
+        view.register_hint_source(self._hints)
+        if self._ai is not None:
+            view.register_computer_observer(self)
+            view.register_computer_source(self._ai)
 
+        if view.playerid == Team.Player2:
+            self._request_resync()  # Late join: fetch what differs
+        self._play_ai()
         view.run()
 
     def on_click(self, location: Location | None):
         """
-        Whenever a click occurs, check if valid
-        Check if selecting piece or moving piece
+        Whenever a local click occurs, check if valid
+        Selecting a piece stays local, a completed move is applied at once
+        and sent to both players
         """
         if not location:
             return
-        if not self._model.state.chosen_piece:
-            self._model.validate_piece(location)
+        model = self._model
+        if not model.state.chosen_piece:
+            model.validate_piece(location)
         else:
-            self._model.check_movement(location)
-        self._on_state_change(self._model.state)
+            action = model.action_for(location)
+            model.clear_selection()
+            if action is not None:
+                self._commit(action)
+        self._on_state_change(model.snapshot())
+
+    def _commit(self, action: Action) -> bool:
+        """
+        Predicts a local action: applies it and keeps it pending
+        until its echo confirms it. False when it is not legal here
+        """
+        model = self._model
+        if not model.is_legal(action):
+            return False
+        seq = self._next_seq
+        self._next_seq += 1
+        self._pending.append(PendingAction(seq, action, model.make(action)))
+        self._view.send_action(action, seq, model.zobrist_key)
+        return True
+
+    def on_action(
+        self, action: Action, sender: Team | None, seq: int, checksum: int
+    ):
+        """
+        Applies an action received from the network in the order the
+        players agree on. The echo of the oldest pending action confirms
+        it; anything else rolls pending actions back, applies the action
+        if its sender is the current player and the model accepts it,
+        then replays the pending actions that are still legal.
+        An opponent's action whose checksum does not match the state it
+        leads to here means the players diverged, which triggers a resync
+        """
+        if self._holding:
+            self._hold(HeldAction(action, sender, seq, checksum))
+            return
+        model = self._model
+        pending = self._pending
+        mine = sender == self._view.playerid
+        if mine:
+            self._ai_waiting = False
+        if mine and pending and pending[0].seq == seq:
+            if pending[0].action == action:
+                pending.popleft()
+                self._play_ai()
+                return
+
+        replay = self._rollback()
+        if mine:
+            # Echoes come back in order, older pending actions were dropped
+            replay = [entry for entry in replay if entry.seq > seq]
+        if sender == model.state.curr_player and model.is_legal(action):
+            model.make(action)
+        if not mine and model.zobrist_key & CHECKSUM_MASK != checksum:
+            self._request_resync()
+        self._replay(replay)
+        self._on_state_change(model.snapshot())
+        self._play_ai()
+
+    def _request_resync(self):
+        """
+        Asks for the other side's state, sending our confirmed cells so
+        only the differing ones come back. The reply to a request already
+        sent fixes the same divergence, so only one is out at a time
+        """
+        if self._requests_out:
+            return
+        replay = self._rollback()
+        self._requests_out += 1
+        self._view.send_state_request(self._model.snapshot())
+        self._replay(replay)
+
+    def on_state_request_echo(self):
+        """
+        Our request came back through the relay. The reply is the state
+        as of this point, so actions ordered after it wait for the reply
+        """
+        if self._requests_out:
+            self._holding = True
+
+    def _hold(self, held: HeldAction):
+        """
+        Keeps an action until the state reply arrives. The other side
+        answers within one of its turns; any more of its actions mean
+        no reply is coming, and they are applied after all
+        """
+        self._held.append(held)
+        playerid = self._view.playerid
+        if sum(entry.sender != playerid for entry in self._held) > MOVES_PER_TURN:
+            self._requests_out = 0
+            self._release()
+
+    def _release(self):
+        """
+        Stops holding and applies the held actions in the order received
+        """
+        self._holding = False
+        held, self._held = self._held, []
+        for entry in held:
+            self.on_action(*entry)
+
+    def on_state_request(self, request: str):
+        """
+        Answers from the confirmed state, without pending predictions
+        """
+        replay = self._rollback()
+        self._view.send_state(state_reply(request, self._model.snapshot()))
+        self._replay(replay)
+
+    def on_reject(self, seq: int):
+        """
+        The server refused a local action: undoes it along with the
+        older pending ones, then replays the rest
+        """
+        self._ai_waiting = False
+        replay = [entry for entry in self._rollback() if entry.seq > seq]
+        self._replay(replay)
+        self._on_state_change(self._model.snapshot())
+        self._play_ai()
+
+    def _rollback(self) -> list[PendingAction]:
+        """
+        Unmakes every pending action, newest first, returning them
+        oldest first
+        """
+        model = self._model
+        pending = list(self._pending)
+        for entry in reversed(pending):
+            model.unmake(entry.record)
+        self._pending.clear()
+        return pending
+
+    def _replay(self, entries: list[PendingAction]):
+        """
+        Makes rolled back actions again, dropping those no longer legal
+        """
+        model = self._model
+        for entry in entries:
+            if model.is_legal(entry.action):
+                self._pending.append(entry._replace(record=model.make(entry.action)))
 
     def initialize_p2_game(self, strgamestate: str):
-        self._model.read_gamestate(strgamestate)
-        self._on_state_change(self._model.state)
+        """
+        Loads a full state or resync diff under the pending predictions.
+        A binary payload this client cannot read, such as one from another
+        WIRE_VERSION, is dropped and the text format is asked for instead.
+        Actions held since the request are applied on top
+        """
+        self._requests_out = max(self._requests_out - 1, 0)
+        replay = self._rollback()
+        try:
+            self._model.load_gamestate(strgamestate)
+        except ValueError:
+            if not strgamestate.startswith(TEXT_PREFIX):
+                self._requests_out += 1
+                self._view.send_state_request()
+        self._replay(replay)
+        self._on_state_change(self._model.snapshot())
+        self._release()
+        self._play_ai()
+
+    def _play_ai(self):
+        """
+        Starts the computer's search on its worker when it is its turn,
+        waiting for each action to come back before picking the next one
+        """
+        ai = self._ai
+        model = self._model
+        state = model.state
+        if ai is None or self._ai_waiting or state.winner:
+            return
+        if state.curr_player != self._view.playerid:
+            return
+        if self._ai_key == model.zobrist_key:
+            return  # Already searching this state
+        self._ai_key = model.zobrist_key
+        ai.start(model)
+
+    def on_computer_action(self, action: Action):
+        """
+        Sends the computer's choice if the state it searched is still
+        the current one, searching again otherwise
+        """
+        model = self._model
+        if self._ai_key != model.zobrist_key:
+            self._ai_key = None
+            self._play_ai()
+            return
+        self._ai_key = None
+        if self._ai_waiting or model.state.curr_player != self._view.playerid:
+            return
+        self._ai_waiting = self._commit(action)
+        self._on_state_change(model.snapshot())
+
+    def on_hint_request(self, enabled: bool):
+        self._hints_enabled = enabled
+        self._analyze()
+
+    def _analyze(self):
+        """
+        Restarts the hint analysis when the position changes,
+        only while hints are on and it is the local player's turn
+        """
+        model = self._model
+        state = model.state
+        key = model.zobrist_key
+        if not self._hints_enabled or state.winner:
+            key = None
+        elif state.curr_player != self._view.playerid:
+            key = None
+        if key == self._hint_key:
+            return  # Selection changes keep the running analysis
+        self._hint_key = key
+        self._hints.cancel()
+        if key is not None:
+            self._hints.start(model)
 
     def register_game_state_change_observer(self, observer: GameStateChangeObserver):
         self._game_state_change_observers.append(observer)
 
-    def _on_state_change(self, state: GameStateProtocol):
+    def _on_state_change(self, state: GameSnapshot):
         for observer in self._game_state_change_observers:
             observer.on_state_change(state)
+        self._analyze()
@@ -0,0 +1,285 @@
+import copy
+import random
+import time
+from model import GameModel, UndoRecord
+from project_types import Action, GameSnapshot, PieceID, Team
+from bitboard import (
+    CAPTURED_SLOTS,
+    MOVE_MASKS,
+    MOVE_TABLES,
+    NEIGHBORS,
+    PIECE_CODES,
+    FULL_BOARD,
+)
+
+
+class IllegalActionError(ValueError):
+    pass
+
+
+class Engine:
+    def __init__(self, model: GameModel | None = None):
+        """
+        Headless entry point to the rules: no pygame, no networking,
+        no pixel Locations. Drives a GameModel through Actions only.
+        """
+        self._model = model if model is not None else GameModel()
+
+    @property
+    def model(self) -> GameModel:
+        return self._model
+
+    @property
+    def curr_player(self) -> Team:
+        return self._model.state.curr_player
+
+    @property
+    def moves_left(self) -> int:
+        return self._model.state.moves_left
+
+    @property
+    def winner(self) -> Team | None:
+        return self._model.state.winner
+
+    @property
+    def over(self) -> bool:
+        return self._model.state.winner is not None
+
+    def legal_actions(self) -> list[Action]:
+        return self._model.legal_actions()
+
+    def is_legal(self, action: Action) -> bool:
+        return self._model.is_legal(action)
+
+    def play(self, action: Action) -> UndoRecord:
+        """
+        Validates then applies an action of the current player
+        """
+        if not self._model.is_legal(action):
+            raise IllegalActionError(f"Illegal action {action}")
+        return self._model.make(action)
+
+    def unplay(self, record: UndoRecord):
+        self._model.unmake(record)
+
+    def undo(self) -> bool:
+        return self._model.undo()
+
+    def snapshot(self) -> GameSnapshot:
+        return self._model.snapshot()
+
+    def copy(self) -> "Engine":
+        return Engine(copy.deepcopy(self._model))
+
+
+PLAYOUT_TEAMS = (Team.Player1, Team.Player2)
+SUMMONER_CODE = PIECE_CODES[PieceID.SUMMONER]
+# (every target, (jumped square, target) pairs, is a summoner) per square,
+# indexed by code * 2 + team index
+PlayoutEntry = tuple[int, tuple[tuple[int, int], ...], bool]
+PLAYOUT_TABLES: list[list[PlayoutEntry]] = [
+    [] for _ in range(2 * (len(PIECE_CODES) + 1))
+]
+for (_pieceid, _team), _table in MOVE_TABLES.items():
+    PLAYOUT_TABLES[PIECE_CODES[_pieceid] * 2 + PLAYOUT_TEAMS.index(_team)] = [
+        (
+            reach,
+            tuple((blocker, target) for target, blocker, _ in entries if blocker),
+            _pieceid == PieceID.SUMMONER,
+        )
+        for reach, entries in zip(MOVE_MASKS[(_pieceid, _team)], _table)
+    ]
+
+
+def _adjacent(summoners: int) -> int:
+    mask = 0
+    while summoners:
+        low = summoners & -summoners
+        mask |= NEIGHBORS[low.bit_length() - 1]
+        summoners ^= low
+    return mask
+
+
+class Playout:
+    __slots__ = (
+        "kinds",
+        "teams",
+        "summoners",
+        "captured",
+        "curr",
+        "moves_left",
+        "winner",
+    )
+
+    def __init__(self, model: GameModel):
+        """
+        Bare copy of a position for random playouts, following the same
+        rules as GameModel without its Piece objects, snapshots or undo
+        records. Squares hold a playout table index, -1 when empty
+        """
+        bitboards = model.bitboards
+        state = model.state
+        self.kinds = [-1] * len(NEIGHBORS)
+        self.teams = [bitboards.teams[team] for team in PLAYOUT_TEAMS]
+        self.summoners = bitboards.pieces[PieceID.SUMMONER]
+        self.captured: list[list[int]] = [[], []]
+        for index, team in enumerate(PLAYOUT_TEAMS):
+            for pieceid, mask in bitboards.pieces.items():
+                mask &= self.teams[index]
+                while mask:
+                    low = mask & -mask
+                    self.kinds[low.bit_length() - 1] = (
+                        PIECE_CODES[pieceid] * 2 + index
+                    )
+                    mask ^= low
+            for slot in range(CAPTURED_SLOTS):
+                pieceid = bitboards.captured_at(team, slot)
+                if pieceid is not None:
+                    self.captured[index].append(PIECE_CODES[pieceid])
+        self.curr = PLAYOUT_TEAMS.index(state.curr_player)
+        self.moves_left = state.moves_left
+        self.winner = state.winner
+
+    def run(self, rng: random.Random, max_actions: int) -> Team | None:
+        """
+        Plays uniformly random legal actions until someone wins
+        or max_actions runs out, returning the winner
+        """
+        for _ in range(max_actions):
+            if self.winner is not None or not self.step(rng):
+                break
+        return self.winner
+
+    def step(self, rng: random.Random) -> bool:
+        """
+        Plays one uniformly random legal action, False when there is none.
+        Actions are counted per piece from target masks and only the
+        chosen one is ever built
+        """
+        kinds = self.kinds
+        curr = self.curr
+        own = self.teams[curr]
+        occupied = own | self.teams[1 - curr]
+        captured = self.captured[curr]
+        free = ~occupied
+        if len(captured) == CAPTURED_SLOTS:
+            open_ = free
+        else:
+            open_ = ~(own | self.summoners)
+
+        tables = PLAYOUT_TABLES
+        moves: list[tuple[int, int]] = []
+        total = 0
+        pieces = own
+        while pieces:
+            low = pieces & -pieces
+            square = low.bit_length() - 1
+            pieces ^= low
+            reach, jumps, summoner = tables[kinds[square]][square]
+            for blocker, target in jumps:
+                if blocker & occupied:
+                    reach &= ~target
+            targets = reach & (free if summoner else open_)
+            if targets:
+                moves.append((square, targets))
+                total += targets.bit_count()
+
+        drops = 0
+        if captured:
+            drops = free & FULL_BOARD & ~_adjacent(self.summoners)
+        drop_count = drops.bit_count() if drops else 0
+        options = total + drop_count * len(captured)
+        if not options:
+            return False
+
+        pick = rng.randrange(options)
+        if pick < total:
+            for square, targets in moves:
+                count = targets.bit_count()
+                if pick < count:
+                    self._move(square, _nth_bit(targets, pick))
+                    break
+                pick -= count
+        else:
+            slot, pick = divmod(pick - total, drop_count)
+            self._drop(slot, _nth_bit(drops, pick))
+        self._end_action()
+        return True
+
+    def _move(self, square: int, target: int):
+        """
+        Moves or captures, the captured piece joining the mover's side
+        """
+        kinds = self.kinds
+        curr = self.curr
+        kind = kinds[square]
+        to_square = target.bit_length() - 1
+        victim = kinds[to_square]
+        if victim >= 0:
+            other = 1 - curr
+            self.teams[other] &= ~target
+            if victim >> 1 == SUMMONER_CODE:
+                self.summoners &= ~target
+            self.captured[curr].append(victim >> 1)
+        source = 1 << square
+        self.teams[curr] = self.teams[curr] & ~source | target
+        if kind >> 1 == SUMMONER_CODE:
+            self.summoners = self.summoners & ~source | target
+        kinds[square] = -1
+        kinds[to_square] = kind
+
+    def _drop(self, slot: int, target: int):
+        curr = self.curr
+        code = self.captured[curr].pop(slot)
+        self.kinds[target.bit_length() - 1] = code * 2 + curr
+        self.teams[curr] |= target
+        if code == SUMMONER_CODE:
+            self.summoners |= target
+
+    def _end_action(self):
+        """
+        Same turn and winner bookkeeping as GameModel.make
+        """
+        self.moves_left -= 1
+        if self.moves_left == 0:
+            self.curr = 1 - self.curr
+            self.moves_left = 3
+        occupied = self.teams[0] | self.teams[1]
+        mobile = [
+            bool(_adjacent(self.summoners & team) & ~occupied) for team in self.teams
+        ]
+        if not mobile[0] and not mobile[1]:
+            self.winner = Team.Neutral
+        elif not mobile[0]:
+            self.winner = Team.Player2
+        elif not mobile[1]:
+            self.winner = Team.Player1
+
+
+def _nth_bit(mask: int, n: int) -> int:
+    for _ in range(n):
+        mask &= mask - 1
+    return mask & -mask
+
+
+def random_game(rng: random.Random, max_actions: int = 1000) -> Team | None:
+    """
+    Plays uniformly random legal actions from the initial position until
+    someone wins or max_actions runs out, returning the winner
+    """
+    return Playout(GameModel()).run(rng, max_actions)
+
+
+def main():
+    rng = random.Random(0)
+    games = 1000
+    start = time.perf_counter()
+    results = [random_game(rng) for _ in range(games)]
+    elapsed = time.perf_counter() - start
+    print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.0f} games/s)")
+    for team in (Team.Player1, Team.Player2, Team.Neutral, None):
+        print(f"{team}: {results.count(team)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import copy
+import queue
+import threading
+from typing import Callable
+from ai import AlphaBetaAI, SearchResult
+from model import GameModel
+from project_types import Hint
+
+
+class HintAnalyzer:
+    def __init__(
+        self,
+        time_budget: float = 2.0,
+        wakeup: Callable[[], None] | None = None,
+    ):
+        """
+        Suggests a move from a background thread.
+        Every finished search depth is streamed back as a Hint through a
+        queue, so the render loop only ever drains ready results.
+        wakeup is called from the worker thread whenever a Hint is ready.
+        """
+        self._ai = AlphaBetaAI(time_budget=time_budget)
+        self._wakeup = wakeup
+        self._requests: queue.Queue[tuple[int, GameModel, threading.Event]] = (
+            queue.Queue()
+        )
+        self._results: queue.Queue[Hint] = queue.Queue()
+        self._generation = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def start(self, model: GameModel):
+        """
+        Cancels any running analysis and analyzes a copy of model
+        """
+        self.cancel()
+        self._stop = threading.Event()
+        self._requests.put((self._generation, copy.deepcopy(model), self._stop))
+
+    def cancel(self):
+        """
+        Stops the running analysis; results already queued become stale
+        """
+        self._stop.set()
+        self._generation += 1
+
+    def poll(self) -> Hint | None:
+        """
+        Latest hint of the current analysis, if a new one arrived
+        """
+        latest = None
+        while True:
+            try:
+                hint = self._results.get_nowait()
+            except queue.Empty:
+                return latest
+            if hint.generation == self._generation:
+                latest = hint
+
+    def _work(self):
+        while True:
+            generation, model, stop = self._requests.get()
+            if stop.is_set():
+                continue
+
+            def on_depth(result: SearchResult):
+                if result.action is None or stop.is_set():
+                    return
+                self._results.put(
+                    Hint(result.action, result.depth, result.score, generation)
+                )
+                if self._wakeup is not None:
+                    self._wakeup()
+
+            self._ai.search(model, on_depth=on_depth, should_stop=stop.is_set)
@@ -0,0 +1,119 @@
+import pygame
+from typing import NamedTuple
+from project_types import GridID
+
+CellKey = tuple[GridID, int, int]
+
+
+class GridGeometry(NamedTuple):
+    gridid: GridID
+    xstart: int
+    ystart: int
+    rows: int
+    cols: int
+
+
+class Layout:
+    def __init__(
+        self,
+        screen_xlen: int,
+        box_xlen: int = 75,
+        box_ylen: int = 75,
+        gap: int = 2,
+        ystart: int = 100,
+    ):
+        """
+        Screen geometry of the grids, shared by drawing and hit-testing.
+        Cells are box_xlen by box_ylen with gap pixels between them, so
+        a grid is an origin plus a stride per axis.
+        Grids are listed in hit-testing priority.
+        """
+        self._box_xlen = box_xlen
+        self._box_ylen = box_ylen
+        self._gap = gap
+        self._xstride = box_xlen + gap
+        self._ystride = box_ylen + gap
+        self._ystart = ystart
+        self._grids = [
+            GridGeometry(GridID.CAPTURED1, self._xstride, ystart, 1, 3),
+            GridGeometry(
+                GridID.BOARD, (screen_xlen - 5 * self._xstride) // 2, ystart, 5, 5
+            ),
+            GridGeometry(
+                GridID.CAPTURED2, screen_xlen - 4 * self._xstride, ystart, 1, 3
+            ),
+        ]  # Specifications
+        self._by_id = {grid.gridid: grid for grid in self._grids}
+        self._rects: dict[CellKey, tuple[int, int, int, int]] = {
+            (grid.gridid, i, j): (
+                grid.xstart + self._xstride * j,
+                grid.ystart + self._ystride * i,
+                box_xlen,
+                box_ylen,
+            )
+            for grid in self._grids
+            for i in range(grid.rows)
+            for j in range(grid.cols)
+        }
+
+    @property
+    def box_xlen(self) -> int:
+        return self._box_xlen
+
+    @property
+    def box_ylen(self) -> int:
+        return self._box_ylen
+
+    @property
+    def xstride(self) -> int:
+        return self._xstride
+
+    @property
+    def ystride(self) -> int:
+        return self._ystride
+
+    @property
+    def ystart(self) -> int:
+        return self._ystart
+
+    @property
+    def cells(self) -> list[CellKey]:
+        return list(self._rects)
+
+    def grid(self, gridid: GridID) -> GridGeometry:
+        return self._by_id[gridid]
+
+    def xstart(self, gridid: GridID) -> int:
+        return self._by_id[gridid].xstart
+
+    def xend(self, gridid: GridID) -> int:
+        """
+        Right edge of a grid's last column, inclusive
+        """
+        grid = self._by_id[gridid]
+        return grid.xstart + grid.cols * self._xstride - self._gap
+
+    def cell_rect(self, gridid: GridID, i: int, j: int) -> pygame.Rect:
+        return pygame.Rect(self._rects[(gridid, i, j)])
+
+    def hit(self, x: int, y: int) -> CellKey | None:
+        """
+        Cell under a pixel, None over a gap or outside every grid.
+        Edges count as inside, and a pixel within a grid's columns
+        never falls through to a later grid
+        """
+        for grid in self._grids:
+            if grid.xstart <= x <= self.xend(grid.gridid):
+                break
+        else:
+            return None
+        dy = y - grid.ystart
+        if dy < 0:
+            return None
+        j, xoff = divmod(x - grid.xstart, self._xstride)
+        i, yoff = divmod(dy, self._ystride)
+        if xoff > self._box_xlen or yoff > self._box_ylen:
+            return None
+        if i >= grid.rows or j >= grid.cols:
+            return None
+        return (grid.gridid, i, j)
@@ -1,17 +1,62 @@
+import argparse
+import sys
 from view import GameView
 from model import GameModel
 from controller import GameController
+from ai import AlphaBetaAI, ComputerPlayer
+from mcts import MCTSAI
+from transport import Network, ThreadedTransport
+from server import ServerNetwork
 from cs150241project_networking import CS150241ProjectNetworking
 
 
 def main():
-    network = CS150241ProjectNetworking.connect("localhost", 15000)
+    # Search, hint and I/O threads hand the GIL back to the render loop
+    # within a millisecond instead of the default five
+    sys.setswitchinterval(0.001)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--ai",
+        nargs="?",
+        const="alphabeta",
+        choices=["alphabeta", "mcts"],
+        help="let the computer play this client",
+    )
+    parser.add_argument(
+        "--playouts", type=int, default=2000, help="MCTS playouts per action"
+    )
+    parser.add_argument(
+        "--server",
+        metavar="HOST:PORT",
+        help="play through an authoritative game server instead of the relay",
+    )
+    args = parser.parse_args()
+
+    ai: ComputerPlayer | None = None
+    if args.ai == "alphabeta":
+        ai = AlphaBetaAI()
+    elif args.ai == "mcts":
+        ai = MCTSAI(playouts=args.playouts, report=print)
+
+    network: Network
+    if args.server:
+        host, _, port = args.server.rpartition(":")
+        network = ServerNetwork.connect(host, int(port))
+    else:
+        network = CS150241ProjectNetworking.connect("localhost", 15000)
+    transport = ThreadedTransport(network)
 
     model = GameModel()
-    view = GameView(model.state, network)
-    controller = GameController(model, view)
+    view = GameView(model.snapshot(), transport)
+    controller = GameController(model, view, ai)
 
-    controller.start()
+    transport.start(view.wake)
+    try:
+        controller.start()
+    finally:
+        transport.close()
+        if isinstance(ai, MCTSAI):
+            ai.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+import copy
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from typing import Callable, NamedTuple
+from engine import Playout
+from model import GameModel, UndoRecord
+from project_types import Action, Team
+
+
+class MCTSResult(NamedTuple):
+    action: Action | None
+    playouts: int
+    nodes: int
+    elapsed: float
+    nodes_per_sec: float
+    rollouts_per_sec: float
+
+    def summary(self) -> str:
+        return (
+            f"MCTS: {self.playouts} playouts, {self.nodes} nodes in "
+            f"{self.elapsed:.2f}s ({self.nodes_per_sec:.0f} nodes/s, "
+            f"{self.rollouts_per_sec:.0f} rollouts/s)"
+        )
+
+
+class RootStats(NamedTuple):
+    visits: dict[Action, int]
+    nodes: int
+    playouts: int
+
+
+class _Node:
+    __slots__ = ("action", "player", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(
+        self,
+        action: Action | None,
+        player: Team | None,
+        parent: "_Node | None",
+        untried: list[Action],
+    ):
+        self.action = action
+        self.player = player  # Who played action, wins are counted for them
+        self.parent = parent
+        self.children: list[_Node] = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration: float) -> "_Node":
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: child.wins / child.visits
+            + exploration * math.sqrt(log_visits / child.visits),
+        )
+
+
+def _reward(winner: Team | None, player: Team | None) -> float:
+    if winner is None or winner == Team.Neutral:
+        return 0.5
+    return 1.0 if winner == player else 0.0
+
+
+def run_tree(
+    model: GameModel,
+    playouts: int,
+    seed: int,
+    exploration: float = 1.4,
+    max_rollout: int = 200,
+) -> RootStats:
+    """
+    One independent UCT search, run inside a worker process.
+    Walks the tree on model through make/unmake and rolls out on a Playout
+    """
+    rng = random.Random(seed)
+    state = model.state
+    root = _Node(None, None, None, model.legal_actions())
+    rng.shuffle(root.untried)
+    nodes = 1
+
+    for _ in range(playouts):
+        node = root
+        records: list[UndoRecord] = []
+
+        # Selection
+        while not node.untried and node.children:
+            node = node.select_child(exploration)
+            assert node.action is not None
+            records.append(model.make(node.action))
+
+        # Expansion
+        if node.untried:
+            action = node.untried.pop()
+            player = state.curr_player
+            records.append(model.make(action))
+            untried = model.legal_actions()
+            rng.shuffle(untried)
+            child = _Node(action, player, node, untried)
+            node.children.append(child)
+            node = child
+            nodes += 1
+
+        # Rollout, on a bare copy of the position
+        winner = Playout(model).run(rng, max_rollout)
+
+        for record in reversed(records):
+            model.unmake(record)
+
+        # Backpropagation
+        walk: _Node | None = node
+        while walk is not None:
+            walk.visits += 1
+            walk.wins += _reward(winner, walk.player)
+            walk = walk.parent
+
+    visits: dict[Action, int] = {}
+    for child in root.children:
+        assert child.action is not None
+        visits[child.action] = child.visits
+    return RootStats(visits, nodes, playouts)
+
+
+def _worker_context() -> BaseContext:
+    """
+    Start method for the worker processes. The client is multi-threaded
+    by the time the pool starts, so workers are never forked from it:
+    a fork server that only preloads this module where available,
+    spawned interpreters otherwise
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["mcts"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class MCTSAI:
+    def __init__(
+        self,
+        playouts: int = 2000,
+        workers: int | None = None,
+        exploration: float = 1.4,
+        max_rollout: int = 200,
+        seed: int = 0,
+        report: Callable[[str], None] | None = None,
+    ):
+        """
+        Root-parallel Monte Carlo Tree Search: every worker process grows
+        its own tree over a share of the playout budget, then root visit
+        counts are summed and the most visited action is played.
+        report, if given, is called with a throughput summary of every choice.
+        """
+        self._playouts = playouts
+        self._workers = workers or os.cpu_count() or 1
+        self._exploration = exploration
+        self._max_rollout = max_rollout
+        self._rng = random.Random(seed)
+        self._pool: ProcessPoolExecutor | None = None
+        self._report = report
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def choose(self, model: GameModel) -> Action | None:
+        result = self.search(model)
+        if self._report is not None:
+            self._report(result.summary())
+        return result.action
+
+    def search(self, model: GameModel) -> MCTSResult:
+        start = time.perf_counter()
+        workers = min(self._workers, self._playouts)
+        shares = [self._playouts // workers] * workers
+        shares[0] += self._playouts - sum(shares)
+        seeds = [self._rng.getrandbits(32) for _ in shares]
+
+        if workers == 1:
+            results = [
+                run_tree(
+                    copy.deepcopy(model),
+                    shares[0],
+                    seeds[0],
+                    self._exploration,
+                    self._max_rollout,
+                )
+            ]
+        else:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers, mp_context=_worker_context()
+                )
+            futures = [
+                self._pool.submit(
+                    run_tree, model, share, seed, self._exploration, self._max_rollout
+                )
+                for share, seed in zip(shares, seeds)
+            ]
+            results = [future.result() for future in futures]
+
+        visits: dict[Action, int] = {}
+        for result in results:
+            for action, count in result.visits.items():
+                visits[action] = visits.get(action, 0) + count
+        nodes = sum(result.nodes for result in results)
+        playouts = sum(result.playouts for result in results)
+        elapsed = time.perf_counter() - start
+
+        return MCTSResult(
+            max(visits, key=lambda action: visits[action]) if visits else None,
+            playouts,
+            nodes,
+            elapsed,
+            nodes / elapsed if elapsed else 0.0,
+            playouts / elapsed if elapsed else 0.0,
+        )
@@ -1,12 +1,54 @@
-from project_types import Piece, GameStateProtocol, Location, GridID, Team, PieceID
+from project_types import (
+    Piece,
+    GameStateProtocol,
+    GameSnapshot,
+    Row,
+    Location,
+    GridID,
+    Team,
+    PieceID,
+    PIECE_ICON_PATHS,
+    Action,
+    ActionKind,
+)
+from bitboard import (
+    Bitboards,
+    CODE_PIECES,
+    MOVE_TABLES,
+    MoveSet,
+    bit,
+    cells,
+    on_board,
+)
+from wire import (
+    BINARY_PREFIX,
+    CELL_SET,
+    CHOSEN_OFFSET,
+    CODE_GRIDS,
+    CODE_MASK,
+    CODE_TEAMS,
+    DIFF_HEADER,
+    DIFF_PREFIX,
+    MOVES_OFFSET,
+    NO_CELL,
+    P2_FLAG,
+    STATE_CELLS,
+    STATE_SIZE,
+    TEXT_PREFIX,
+    cell_nibble,
+    piece_nibble,
+    unpack_diff,
+    unpack_state,
+)
+from zobrist import CAPTURED_KEYS, board_key, hash_pieces, turn_key
+from typing import NamedTuple
 
 
 class Goblin(Piece):
     def __init__(self, i: int, j: int, team: Team):
         super().__init__(i, j, team)
 
-        self._path = "icon_images/goblin.png"
-        self._movement = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+        self._path = PIECE_ICON_PATHS[PieceID.GOBLIN]
         self._pieceid = PieceID.GOBLIN
 
 
@@ -14,21 +56,7 @@ class Dragon(Piece):
     def __init__(self, i: int, j: int, team: Team):
         super().__init__(i, j, team)
 
-        self._path = "icon_images/dragon.png"
-        self._movement = [
-            (0, -2),
-            (0, -1),
-            (0, 1),
-            (0, 2),
-            (-2, 0),
-            (-1, 0),
-            (1, 0),
-            (2, 0),
-            (-1, -1),
-            (-1, 1),
-            (1, -1),
-            (1, 1),
-        ]
+        self._path = PIECE_ICON_PATHS[PieceID.DRAGON]
         self._pieceid = PieceID.DRAGON
 
 
@@ -36,21 +64,15 @@ class Slime(Piece):
     def __init__(self, i: int, j: int, team: Team):
         super().__init__(i, j, team)
 
-        self._path = "icon_images/slime.png"
-        self._movement = [(1, 0)] if self._team == Team.Player1 else [(-1, 0)]
+        self._path = PIECE_ICON_PATHS[PieceID.SLIME]
         self._pieceid = PieceID.SLIME
 
-    def update_piece_team(self, newteam: Team):
-        self._movement = [(1, 0)] if newteam == Team.Player1 else [(-1, 0)]
-        self._team = newteam
-
 
 class Summoner(Piece):
     def __init__(self, i: int, j: int, team: Team):
         super().__init__(i, j, team)
 
-        self._path = "icon_images/summoner.png"
-        self._movement = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+        self._path = PIECE_ICON_PATHS[PieceID.SUMMONER]
         self._pieceid = PieceID.SUMMONER
 
 
@@ -58,20 +80,19 @@ class Centaur(Piece):
     def __init__(self, i: int, j: int, team: Team):
         super().__init__(i, j, team)
 
-        self._path = "icon_images/centaur.png"
-        self._movement = [
-            (0, -2),
-            (0, -1),
-            (0, 1),
-            (0, 2),
-            (-2, 0),
-            (-1, 0),
-            (1, 0),
-            (2, 0),
-        ]
+        self._path = PIECE_ICON_PATHS[PieceID.CENTAUR]
         self._pieceid = PieceID.CENTAUR
 
 
+PIECE_CLASSES: dict[PieceID, type[Piece]] = {
+    PieceID.GOBLIN: Goblin,
+    PieceID.DRAGON: Dragon,
+    PieceID.SLIME: Slime,
+    PieceID.SUMMONER: Summoner,
+    PieceID.CENTAUR: Centaur,
+}
+
+
 class GameState(GameStateProtocol):
     def __init__(self):
         t1 = Team.Player1
@@ -98,71 +119,310 @@ class GameState(GameStateProtocol):
         self.captured1_state = [[None, None, None]]
         self.captured2_state = [[None, None, None]]
         self.chosen_piece = None
-        self.possible_move = []
+        self.possible_move = MoveSet()
         self.curr_player = Team.Player1
         self.moves_left = 3
         self.winner = None
 
 
+class UndoRecord(NamedTuple):
+    """
+    Everything make() changed, enough for unmake() to restore it exactly
+    """
+
+    action: Action
+    piece: Piece
+    captured: Piece | None
+    captured_slot: int
+    captured_team: Team | None
+    curr_player: Team
+    moves_left: int
+    winner: Team | None
+
+
 class GameModel:
     def __init__(self):
         self.state = GameState()
-        self._summoners = self._get_summoner()
         self._team_opposites = {Team.Player1: Team.Player2, Team.Player2: Team.Player1}
         self._team_captured = {
             Team.Player1: self.state.captured1_state,
             Team.Player2: self.state.captured2_state,
         }
+        self._team_captured_id = {
+            Team.Player1: GridID.CAPTURED1,
+            Team.Player2: GridID.CAPTURED2,
+        }
+        self._grids = {
+            GridID.BOARD: self.state.board_state,
+            GridID.CAPTURED1: self.state.captured1_state,
+            GridID.CAPTURED2: self.state.captured2_state,
+        }
+        self._snapshot_rows: dict[GridID, list[Row]] = {
+            gridid: [tuple(p and p.view() for p in row) for row in grid]
+            for gridid, grid in self._grids.items()
+        }
+        self._dirty_rows: set[tuple[GridID, int]] = set()
+        self._captured_team = {
+            GridID.CAPTURED1: Team.Player1,
+            GridID.CAPTURED2: Team.Player2,
+        }
+        self._bitboards = Bitboards.from_grids(
+            self.state.board_state,
+            self.state.captured1_state,
+            self.state.captured2_state,
+        )
+        self._history: list[UndoRecord] = []
+        self._pieces_key = hash_pieces(self._bitboards)
+
+    @property
+    def bitboards(self) -> Bitboards:
+        return self._bitboards
+
+    @property
+    def zobrist_key(self) -> int:
+        """
+        64-bit key identifying the position: board, both captured grids,
+        curr_player and moves_left. Equal positions have equal keys on
+        every client
+        """
+        state = self.state
+        return self._pieces_key ^ turn_key(state.curr_player, state.moves_left)
 
-    def _get_summoner(self):
+    def _set_cell(self, gridid: GridID, i: int, j: int, piece: Piece | None):
         """
-        Acquires a list of all Summoners in play
+        Single place where grids are written, keeping the bitboards in sync
+        and letting snapshots know what changed
         """
-        summoners: list[Piece] = []
-        board = self.state.board_state
-        for i in range(5):
-            for j in range(5):  # Specifications
-                piece = board[i][j]
-                if piece is not None and piece.pieceid == PieceID.SUMMONER:
-                    summoners.append(piece)
-        return summoners
+        grid = self._grids[gridid]
+        bitboards = self._bitboards
+        old_piece = grid[i][j]
+        if gridid == GridID.BOARD:
+            if old_piece is not None:
+                bitboards.remove(i, j, old_piece.pieceid, old_piece.team)
+                self._pieces_key ^= board_key(old_piece.pieceid, old_piece.team, i, j)
+            if piece is not None:
+                bitboards.place(i, j, piece.pieceid, piece.team)
+                self._pieces_key ^= board_key(piece.pieceid, piece.team, i, j)
+        else:
+            team = self._captured_team[gridid]
+            bitboards.set_captured(team, j, piece.pieceid if piece else None)
+            if old_piece is not None:
+                self._pieces_key ^= CAPTURED_KEYS[(team, j, old_piece.pieceid)]
+            if piece is not None:
+                self._pieces_key ^= CAPTURED_KEYS[(team, j, piece.pieceid)]
+        grid[i][j] = piece
+        self._dirty_rows.add((gridid, i))
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Immutable view of the state, only rebuilding rows changed since the
+        last snapshot and sharing the rest
+        """
+        for gridid, i in self._dirty_rows:
+            row = self._grids[gridid][i]
+            self._snapshot_rows[gridid][i] = tuple(p and p.view() for p in row)
+        self._dirty_rows.clear()
+
+        state = self.state
+        chosen_piece = state.chosen_piece
+        return GameSnapshot(
+            tuple(self._snapshot_rows[GridID.BOARD]),
+            tuple(self._snapshot_rows[GridID.CAPTURED1]),
+            tuple(self._snapshot_rows[GridID.CAPTURED2]),
+            chosen_piece.view() if chosen_piece else None,
+            state.possible_move,
+            state.curr_player,
+            state.moves_left,
+            state.winner,
+        )
+
+    def legal_actions(self) -> list[Action]:
+        """
+        Every legal action of the current player in one pass:
+        board moves, captures and drops.
+        Does not touch chosen_piece or possible_move
+        """
+        state = self.state
+        if state.winner:
+            return []
+        team = state.curr_player
+        bitboards = self._bitboards
+        occupied = bitboards.occupied()
+        own = bitboards.teams[team]
+        board = state.board_state
+        actions: list[Action] = []
 
-    def check_movement(self, location: Location):
+        # Same filtering as Bitboards.piece_moves, hoisted out of the loop
+        summoner_blocked = own | occupied
+        if bitboards.captured_full(team):
+            blocked = summoner_blocked
+        else:
+            blocked = own | bitboards.pieces[PieceID.SUMMONER]
+        move, capture = ActionKind.MOVE, ActionKind.CAPTURE
+        for i, j in cells(own):
+            piece = board[i][j]
+            assert piece is not None
+            pieceid = piece.pieceid
+            piece_blocked = summoner_blocked if pieceid == PieceID.SUMMONER else blocked
+            for target, blocker, (toi, toj) in MOVE_TABLES[(pieceid, team)][i * 5 + j]:
+                if target & piece_blocked or blocker & occupied:
+                    continue
+                kind = capture if target & occupied else move
+                actions.append(Action(kind, GridID.BOARD, i, j, toi, toj))
+
+        captured_id = self._team_captured_id[team]
+        drop_targets: list[tuple[int, int]] | None = None
+        for j, piece in enumerate(self._team_captured[team][0]):
+            if piece is None:
+                continue
+            if drop_targets is None:
+                drop_targets = cells(bitboards.drop_targets())
+            for toi, toj in drop_targets:
+                actions.append(Action(ActionKind.DROP, captured_id, 0, j, toi, toj))
+
+        return actions
+
+    def is_legal(self, action: Action) -> bool:
+        """
+        Checks a single action without enumerating every legal one
         """
-        Checks if location to move is valid for current chosen piece
-        Move if valid and check if winning after action
+        state = self.state
+        if state.winner or not on_board(action.toi, action.toj):
+            return False
+        team = state.curr_player
+        bitboards = self._bitboards
+
+        if action.gridid == GridID.BOARD:
+            if not on_board(action.fromi, action.fromj):
+                return False
+            piece = state.board_state[action.fromi][action.fromj]
+            if piece is None or piece.team != team:
+                return False
+            targets = bitboards.piece_moves(
+                action.fromi, action.fromj, piece.pieceid, team
+            )
+            if not targets & bit(action.toi, action.toj):
+                return False
+            if state.board_state[action.toi][action.toj]:
+                return action.kind == ActionKind.CAPTURE
+            return action.kind == ActionKind.MOVE
+
+        if action.gridid != self._team_captured_id[team] or action.fromi != 0:
+            return False
+        if not 0 <= action.fromj < 3:  # Specifications
+            return False
+        if self._team_captured[team][0][action.fromj] is None:
+            return False
+        return action.kind == ActionKind.DROP and bool(
+            bit(action.toi, action.toj) & bitboards.drop_targets()
+        )
+
+    def action_for(self, location: Location) -> Action | None:
         """
+        Action of moving the chosen piece to location, if it is one of
+        its possible moves. Changes nothing
+        """
+        state = self.state
+        chosen_piece = state.chosen_piece
         if (
-            location.gridid == GridID.BOARD
-            and (location.loci, location.locj) in self.state.possible_move
+            chosen_piece is None
+            or location.gridid != GridID.BOARD
+            or (location.loci, location.locj) not in state.possible_move
         ):
-            self._move_piece(location)
-            self._check_if_lost()  # Call just for checking if it works, ilipat pa somewhere
+            return None
+        if chosen_piece.gridid != GridID.BOARD:
+            kind = ActionKind.DROP
+        elif state.board_state[location.loci][location.locj]:
+            kind = ActionKind.CAPTURE
         else:
-            self._refresh_chosen_state()
+            kind = ActionKind.MOVE
+        assert chosen_piece.gridid is not None
+        return Action(
+            kind,
+            chosen_piece.gridid,
+            chosen_piece.loci,
+            chosen_piece.locj,
+            location.loci,
+            location.locj,
+        )
+
+    def clear_selection(self):
+        self._refresh_chosen_state()
 
-    def _move_piece(self, location: Location):
+    def make(self, action: Action) -> UndoRecord:
         """
-        Given chosen_piece not None from controller
-        Give valid location to move to:
-        Move piece to empty spot/
-        Move piece and capture another
+        Applies a legal action of the current player
+        Returns the record needed to unmake it
         """
         state = self.state
-        chosen_piece = state.chosen_piece
-        assert chosen_piece is not None
-
-        if chosen_piece.gridid is not GridID.BOARD:
-            self._move_captured_piece(location)
+        piece = self._grids[action.gridid][action.fromi][action.fromj]
+        assert piece is not None
+        location = Location(GridID.BOARD, action.toi, action.toj)
+        captured = state.board_state[action.toi][action.toj]
+        captured_team = captured.team if captured else None
+        captured_slot = -1
+
+        if action.gridid is not GridID.BOARD:
+            self._move_captured_piece(piece, location)
+        elif not captured:
+            self._move_piece_to_empty_location(piece, location)
         else:
-            possible_piece = state.board_state[location.loci][location.locj]
-            if not possible_piece:
-                self._move_piece_to_empty_location(location)
-            else:
-                self._capture_piece(location, possible_piece)
+            captured_slot = self._capture_piece(piece, location, captured)
+
+        record = UndoRecord(
+            action,
+            piece,
+            captured,
+            captured_slot,
+            captured_team,
+            state.curr_player,
+            state.moves_left,
+            state.winner,
+        )
+        self._history.append(record)
+
         self._refresh_chosen_state()
-        self.state.moves_left -= 1
+        state.moves_left -= 1
         self._check_action()
+        self._check_if_lost()
+        return record
+
+    def unmake(self, record: UndoRecord):
+        """
+        Reverts the latest make(), given its record
+        """
+        last = self._history.pop()
+        assert last is record
+        state = self.state
+        action = record.action
+        piece = record.piece
+        captured = record.captured
+
+        if captured is not None:
+            captured_id = self._team_captured_id[record.curr_player]
+            self._set_cell(captured_id, 0, record.captured_slot, None)
+            assert record.captured_team is not None
+            captured.update_piece_team(record.captured_team)
+            captured.update_piece_location(
+                Location(GridID.BOARD, action.toi, action.toj)
+            )
+        self._set_cell(GridID.BOARD, action.toi, action.toj, captured)
+        self._set_cell(action.gridid, action.fromi, action.fromj, piece)
+        piece.update_piece_location(Location(action.gridid, action.fromi, action.fromj))
+
+        state.curr_player = record.curr_player
+        state.moves_left = record.moves_left
+        state.winner = record.winner
+        self._refresh_chosen_state()
+
+    def undo(self) -> bool:
+        """
+        Takes back the latest action, if any
+        """
+        if not self._history:
+            return False
+        self.unmake(self._history[-1])
+        return True
 
     def _check_action(self):
         if self.state.moves_left == 0:
@@ -174,65 +434,48 @@ class GameModel:
 
     def _refresh_chosen_state(self):
         self.state.chosen_piece = None
-        self.state.possible_move = []
+        self.state.possible_move = MoveSet()
 
-    def _move_captured_piece(self, location: Location):
+    def _move_captured_piece(self, piece: Piece, location: Location):
         """
-        Given chosen_piece not None from move_piece()
         Move captured piece from Captured grid to Board
         """
-        state = self.state
-        chosen_piece = state.chosen_piece
-        assert chosen_piece is not None
-        captured_grid = self._team_captured[state.curr_player]
+        captured_id = self._team_captured_id[self.state.curr_player]
+        self._set_cell(captured_id, piece.loci, piece.locj, None)
+        self._set_cell(GridID.BOARD, location.loci, location.locj, piece)
+        piece.update_piece_location(location)
 
-        captured_grid[chosen_piece.loci][chosen_piece.locj] = None
-        state.board_state[location.loci][location.locj] = chosen_piece
-        chosen_piece.update_piece_location(location)
-
-    def _move_piece_to_empty_location(self, location: Location):
+    def _move_piece_to_empty_location(self, piece: Piece, location: Location):
         """
-        Given chosen_piece not None from move_piece()
         Move board piece to empty board space
         """
-        state = self.state
-        chosen_piece = state.chosen_piece
-        assert chosen_piece is not None
-        state.board_state[chosen_piece.loci][chosen_piece.locj] = None
-        state.board_state[location.loci][location.locj] = chosen_piece
-        chosen_piece.update_piece_location(location)
+        self._set_cell(GridID.BOARD, piece.loci, piece.locj, None)
+        self._set_cell(GridID.BOARD, location.loci, location.locj, piece)
+        piece.update_piece_location(location)
 
-    def _capture_piece(self, location: Location, to_capture_piece: Piece):
+    def _capture_piece(
+        self, piece: Piece, location: Location, to_capture_piece: Piece
+    ) -> int:
         """
-        Given chosen_piece not None from move_piece()
         Move board piece to occupied space
         Move captured piece to proper Captured grid space
+        Returns the Captured grid slot used
         """
         state = self.state
-        chosen_piece = state.chosen_piece
-        assert chosen_piece is not None
-        board = state.board_state
-
-        board[chosen_piece.loci][chosen_piece.locj] = None
-        board[location.loci][location.locj] = chosen_piece
-        chosen_piece.update_piece_location(location)
+        self._set_cell(GridID.BOARD, piece.loci, piece.locj, None)
+        self._set_cell(GridID.BOARD, location.loci, location.locj, piece)
+        piece.update_piece_location(location)
 
         captured_grid = self._team_captured[state.curr_player]
+        captured_id = self._team_captured_id[state.curr_player]
         for i in range(1):
             for j in range(3):  # Specifications
                 if not captured_grid[i][j]:
-                    captured_grid[i][j] = to_capture_piece
-                    new_location = location
-                    new_location.gridid = (
-                        GridID.CAPTURED1
-                        if state.curr_player == Team.Player1
-                        else GridID.CAPTURED2
-                    )
-                    new_location.loci = i
-                    new_location.locj = j
-                    to_capture_piece.update_piece_location(location)
+                    self._set_cell(captured_id, i, j, to_capture_piece)
+                    to_capture_piece.update_piece_location(Location(captured_id, i, j))
                     to_capture_piece.update_piece_team(state.curr_player)
-                    return
+                    return j
+        return -1
 
     def validate_piece(self, location: Location):
         """
@@ -263,93 +506,104 @@ class GameModel:
         state = self.state
         gridid = piece.gridid
         if gridid == GridID.BOARD:
-            moves = piece.move()
-            state.possible_move = self._clean_board_moves(piece, moves)
+            state.possible_move = MoveSet(
+                self._bitboards.piece_moves(
+                    piece.loci, piece.locj, piece.pieceid, piece.team
+                )
+            )
         else:
-            state.possible_move = []
-            summoner = self._all_summoner_moves()
-            board = state.board_state
-            for i in range(5):  # Specifications
-                for j in range(5):
-                    if board[i][j] == None and (i, j) not in summoner:
-                        state.possible_move.append((i, j))
+            state.possible_move = MoveSet(self._bitboards.drop_targets())
 
-    def _all_summoner_moves(self) -> set[tuple[int, int]]:
+    def _check_if_lost(self):
         """
-        gets all moves of all summoners, even if invalid
+        Acquires a winner
         """
-        moves: set[tuple[int, int]] = set()
-        for summo in self._summoners:
-            move = summo.move()
-            moves.update(move)
-        return moves
+        state = self.state
+        bitboards = self._bitboards
+        p1_mobile = bitboards.summoner_mobile(Team.Player1)
+        p2_mobile = bitboards.summoner_mobile(Team.Player2)
 
-    def _clean_board_moves(
-        self, piece: Piece, moves: list[tuple[int, int]]
-    ) -> list[tuple[int, int]]:
+        if not p1_mobile and not p2_mobile:
+            state.winner = Team.Neutral
+        elif not p1_mobile:
+            state.winner = Team.Player2
+        elif not p2_mobile:
+            state.winner = Team.Player1
+
+    def load_gamestate(self, payload: str):
         """
-        Gets all movement of a piece
-        and removes invalid ones
+        Loads a state sync payload in any wire format.
+        Raises ValueError for another WIRE_VERSION or a malformed payload;
+        binary payloads are checked before anything is loaded
+        """
+        if payload.startswith(BINARY_PREFIX):
+            self.read_binary_gamestate(unpack_state(payload))
+        elif payload.startswith(DIFF_PREFIX):
+            self.read_state_diff(unpack_diff(payload))
+        else:
+            try:
+                self.read_gamestate(payload.removeprefix(TEXT_PREFIX))
+            except (IndexError, KeyError, AssertionError) as error:
+                raise ValueError(f"malformed text state: {error!r}") from error
+
+    def read_binary_gamestate(self, data: bytes):
+        """
+        Loads a state packed by wire.encode_state, reading the bytes in place
         """
         state = self.state
-        board = state.board_state
-        full_capture = True
-        captured_grid = self._team_captured[piece.team]
-        for i in range(1):  # Specifications
-            for j in range(3):
-                if captured_grid[i][j] == None:
-                    full_capture = False
-                    break
-
-        for i, j in moves[:]:
-            if not (0 <= i and i < 5 and 0 <= j and j < 5):  # Specification
-                moves.remove((i, j))
-            else:
-                check_piece = board[i][j]
-                if check_piece:
-                    if check_piece.team == piece.team:
-                        moves.remove((i, j))
-                    elif check_piece.pieceid == PieceID.SUMMONER:
-                        moves.remove((i, j))
-                    elif piece.pieceid == PieceID.SUMMONER:
-                        moves.remove((i, j))
-                    elif full_capture:
-                        moves.remove((i, j))
-        pi, pj = piece.loci, piece.locj
-        for i, j in moves[:]:  # Removes jumps
-            if (
-                (pi + 2 == i and isinstance(board[pi + 1][j], Piece))
-                or (pi - 2 == i and isinstance(board[pi - 1][j], Piece))
-                or (pj + 2 == j and isinstance(board[i][pj + 1], Piece))
-                or (pj - 2 == j and isinstance(board[i][pj - 1], Piece))
-            ):
-                moves.remove((i, j))
-
-        return moves
+        for index in range(len(STATE_CELLS)):
+            self._load_cell(index, cell_nibble(data, index))
 
-    def _check_if_lost(self):
+        self._refresh_chosen_state()
+        self._history.clear()
+        chosen = data[CHOSEN_OFFSET]
+        if chosen != NO_CELL:
+            grid = self._grids[CODE_GRIDS[chosen >> 6]]
+            state.chosen_piece = grid[chosen >> 3 & 7][chosen & 7]
+        mask = int.from_bytes(data[MOVES_OFFSET:STATE_SIZE], "little")
+        state.possible_move = MoveSet(mask)
+        self._load_turn(data[1])
+
+    def read_state_diff(self, data: bytes):
         """
-        Acquires a winner
+        Applies a diff made by wire.encode_diff: only the listed cells
+        and the turn change
+        """
+        for offset in range(DIFF_HEADER, len(data), 2):
+            index = data[offset]
+            if index >= len(STATE_CELLS):
+                raise ValueError(f"cell index {index} out of range")
+            self._load_cell(index, data[offset + 1])
+        self._refresh_chosen_state()
+        self._history.clear()
+        self._load_turn(data[1])
+
+    def _load_cell(self, index: int, nibble: int):
+        """
+        Writes the piece a wire nibble stands for into a cell of STATE_CELLS
         """
+        gridid, i, j = STATE_CELLS[index]
+        current = self._grids[gridid][i][j]
+        if current is None and not nibble:
+            return
+        if current is not None and nibble == piece_nibble(
+            current.pieceid, current.team
+        ):
+            return  # Already in place, keep the piece
+        piece = None
+        if nibble:
+            team = Team.Player2 if nibble & P2_FLAG else Team.Player1
+            piece = PIECE_CLASSES[CODE_PIECES[nibble & CODE_MASK]](i, j, team)
+            piece.update_piece_location(Location(gridid, i, j))
+        self._set_cell(gridid, i, j, piece)
+
+    def _load_turn(self, turn: int):
         state = self.state
-        summoners = self._summoners
-        p1_moves: list[tuple[int, int]] = []
-        p2_moves: list[tuple[int, int]] = []
-
-        for summ in summoners:
-            valid_moves = self._clean_board_moves(summ, summ.move())
-            if valid_moves:
-                if summ.team == Team.Player1:
-                    p1_moves.extend(valid_moves)
-                else:
-                    p2_moves.extend(valid_moves)
-
-        if not p1_moves and not p2_moves:
-            state.winner = Team.Neutral
-        elif not p1_moves:
-            state.winner = Team.Player2
-        elif not p2_moves:
-            state.winner = Team.Player1
+        current_player = CODE_TEAMS[turn & 3]
+        assert current_player is not None
+        state.curr_player = current_player
+        state.moves_left = turn >> 4
+        state.winner = CODE_TEAMS[turn >> 2 & 3]
 
     def read_gamestate(self, strgamestate: str):
         """
@@ -414,6 +668,8 @@ class GameModel:
             grid = char_to_grid(char[3:5])
             loci = int(char[5])
             locj = int(char[6])
+            if (grid, loci, locj) not in CELL_SET:
+                raise ValueError(f"invalid chosen cell {char[3:7]!r}")
             location = Location(grid, loci, locj)
             match chpiece:
                 case "C":
@@ -439,12 +695,13 @@ class GameModel:
 
         for i in range(5):
             for j in range(5):
-                state.board_state[i][j] = char_to_piece(
-                    board2[i][j], i, j, GridID.BOARD
+                self._set_cell(
+                    GridID.BOARD,
+                    i,
+                    j,
+                    char_to_piece(board2[i][j], i, j, GridID.BOARD),
                 )
 
-        stateinfo = strgamestate.split("#")
-
         captured1str = stateinfo[1]
         captured2str = stateinfo[2]
         captured1 = [captured1str.split(",")]
@@ -452,25 +709,29 @@ class GameModel:
 
         for i in range(1):
             for j in range(3):
-                state.captured1_state[i][j] = char_to_piece(
-                    captured1[i][j], i, j, GridID.CAPTURED1
+                self._set_cell(
+                    GridID.CAPTURED1,
+                    i,
+                    j,
+                    char_to_piece(captured1[i][j], i, j, GridID.CAPTURED1),
                 )
-                state.captured2_state[i][j] = char_to_piece(
-                    captured2[i][j], i, j, GridID.CAPTURED2
+                self._set_cell(
+                    GridID.CAPTURED2,
+                    i,
+                    j,
+                    char_to_piece(captured2[i][j], i, j, GridID.CAPTURED2),
                 )
 
         self._refresh_chosen_state()
+        self._history.clear()
         state.chosen_piece = chosen_char_to_piece(stateinfo[3])
         pos_move = stateinfo[4]
         coords = pos_move.split(",")
         coords.pop()
-        if coords:
-            for loc in coords:
-                self.state.possible_move.append((int(loc[0]), int(loc[1])))
+        state.possible_move = MoveSet.of((int(loc[0]), int(loc[1])) for loc in coords)
 
         current_player = char_to_team(stateinfo[5])
         assert current_player is not None
         state.curr_player = current_player
         state.moves_left = int(stateinfo[6])
         state.winner = char_to_team(stateinfo[7])
-        self._summoners = self._get_summoner()
@@ -1,19 +1,58 @@
 from __future__ import annotations
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol, NamedTuple
 from enum import StrEnum, auto
 
+if TYPE_CHECKING:
+    from bitboard import MoveSet
+
+
+class NetworkMessage(Protocol):
+    @property
+    def src(self) -> int: ...
+
+    @property
+    def payload(self) -> str: ...
+
 
 class ClickObserver(Protocol):
     def on_click(self, location: Location | None): ...
 
 
 class GameStateChangeObserver(Protocol):
-    def on_state_change(self, state: GameStateProtocol): ...
+    def on_state_change(self, state: GameSnapshot): ...
+
+
+class ActionObserver(Protocol):
+    def on_action(
+        self, action: Action, sender: Team | None, seq: int, checksum: int
+    ): ...
+
+    def on_reject(self, seq: int): ...
+
+
+class HintObserver(Protocol):
+    def on_hint_request(self, enabled: bool): ...
+
+
+class HintSource(Protocol):
+    def poll(self) -> Hint | None: ...
+
+
+class ComputerActionObserver(Protocol):
+    def on_computer_action(self, action: Action): ...
+
+
+class ComputerActionSource(Protocol):
+    def poll(self) -> Action | None: ...
 
 
 class GameStateInitializeObserver(Protocol):
     def initialize_p2_game(self, strgamestate: str): ...
 
+    def on_state_request(self, request: str): ...
+
+    def on_state_request_echo(self): ...
+
 
 class Piece:
     def __init__(self, i: int, j: int, team: Team):
@@ -22,22 +61,28 @@ class Piece:
         self._loci = i
         self._locj = j
         self._path: str
-        self._movement: list[tuple[int, int]]
         self._pieceid: PieceID
-
-    def move(self) -> list[tuple[int, int]]:
-        moves: list[tuple[int, int]] = []
-        for k in self._movement:
-            moves.append((k[0] + self._loci, k[1] + self._locj))
-        return moves
+        self._view: PieceView | None = None
 
     def update_piece_location(self, location: Location):
         self._gridid = location.gridid
         self._loci = location.loci
         self._locj = location.locj
+        self._view = None
 
     def update_piece_team(self, newteam: Team):
         self._team = newteam
+        self._view = None
+
+    def view(self) -> PieceView:
+        """
+        Immutable copy of the piece, reused until the piece changes
+        """
+        if self._view is None:
+            self._view = PieceView(
+                self._pieceid, self._team, self._gridid, self._loci, self._locj
+            )
+        return self._view
 
     @property
     def team(self):
@@ -70,12 +115,66 @@ class GameStateProtocol(Protocol):
         self.captured1_state: list[list[Piece | None]]
         self.captured2_state: list[list[Piece | None]]
         self.chosen_piece: None | Piece
-        self.possible_move: list[tuple[int, int]]
+        self.possible_move: MoveSet
         self.curr_player: Team
         self.moves_left: int
         self.winner: None | Team
 
 
+class PieceView(NamedTuple):
+    pieceid: PieceID
+    team: Team
+    gridid: GridID | None
+    loci: int
+    locj: int
+
+
+Row = tuple[PieceView | None, ...]
+
+
+class GameSnapshot(NamedTuple):
+    """
+    Immutable GameState, safe to hold by reference.
+    Unchanged rows and pieces are shared between consecutive snapshots
+    """
+
+    board_state: tuple[Row, ...]
+    captured1_state: tuple[Row, ...]
+    captured2_state: tuple[Row, ...]
+    chosen_piece: PieceView | None
+    possible_move: MoveSet
+    curr_player: Team
+    moves_left: int
+    winner: Team | None
+
+
+class Action(NamedTuple):
+    """
+    A complete move of the current player: a board piece moving or capturing,
+    or a captured piece being dropped, from (fromi, fromj) of gridid
+    to (toi, toj) of the board
+    """
+
+    kind: ActionKind
+    gridid: GridID
+    fromi: int
+    fromj: int
+    toi: int
+    toj: int
+
+
+class Hint(NamedTuple):
+    """
+    Suggested action from a background analysis, generation telling
+    which state it was computed for
+    """
+
+    action: Action
+    depth: int
+    score: int
+    generation: int
+
+
 class Location:
     def __init__(self, gridid: GridID | None, loci: int, locj: int):
         self.gridid = gridid
@@ -89,6 +188,12 @@ class GridID(StrEnum):
     CAPTURED2 = auto()
 
 
+class ActionKind(StrEnum):
+    MOVE = auto()
+    CAPTURE = auto()
+    DROP = auto()
+
+
 class PieceID(StrEnum):
     GOBLIN = auto()
     DRAGON = auto()
@@ -101,3 +206,12 @@ class Team(StrEnum):
     Player1 = auto()
     Player2 = auto()
     Neutral = auto()
+
+
+PIECE_ICON_PATHS: dict[PieceID, str] = {
+    PieceID.GOBLIN: "icon_images/goblin.png",
+    PieceID.DRAGON: "icon_images/dragon.png",
+    PieceID.SLIME: "icon_images/slime.png",
+    PieceID.SUMMONER: "icon_images/summoner.png",
+    PieceID.CENTAUR: "icon_images/centaur.png",
+}
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import random
+import select
+import socket
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+from engine import Engine
+from project_types import Team
+from wire import (
+    ACTION_PREFIX,
+    REJECT_PREFIX,
+    SERVER_ID,
+    STATE_REQUEST,
+    decode_action,
+    encode_action,
+    state_reply,
+)
+
+PLAYER_TEAMS = {1: Team.Player1, 2: Team.Player2}
+
+
+class Delivery(NamedTuple):
+    src: int
+    payload: str
+
+
+# (recipient player id or None for both players, message)
+Route = tuple[int | None, Delivery]
+
+
+class Match:
+    def __init__(self, match_id: int):
+        """
+        Authoritative game between two players. Its Engine is the only
+        state that counts: every action is validated against it and only
+        accepted ones are broadcast, in the order they were accepted.
+        """
+        self._match_id = match_id
+        self._engine = Engine()
+        self._moves = 0
+
+    @property
+    def match_id(self) -> int:
+        return self._match_id
+
+    @property
+    def moves(self) -> int:
+        return self._moves
+
+    @property
+    def engine(self) -> Engine:
+        return self._engine
+
+    def handle(self, player_id: int, payload: str) -> list[Route]:
+        """
+        Applies a message from a seated player, returning what to send
+        """
+        engine = self._engine
+        if payload.startswith(STATE_REQUEST):
+            reply = state_reply(payload, engine.snapshot())
+            return [(player_id, Delivery(SERVER_ID, reply))]
+        if not payload.startswith(ACTION_PREFIX):
+            return []
+        try:
+            message = decode_action(payload)
+        except ValueError:
+            return []
+        if (
+            message.player != player_id
+            or PLAYER_TEAMS.get(player_id) != engine.curr_player
+            or not engine.is_legal(message.action)
+        ):
+            reject = f"{REJECT_PREFIX}{message.seq}"
+            return [(player_id, Delivery(SERVER_ID, reject))]
+        engine.play(message.action)
+        self._moves += 1
+        return [(None, Delivery(player_id, payload))]
+
+
+class Lobby:
+    def __init__(self):
+        """
+        Pairs players into matches in arrival order
+        """
+        self._matches: dict[int, Match] = {}
+        self._waiting: Match | None = None
+        self._next_id = 0
+
+    @property
+    def matches(self) -> dict[int, Match]:
+        return self._matches
+
+    def join(self) -> tuple[Match, int]:
+        """
+        Seats a player as Player 2 of the waiting match,
+        or as Player 1 of a new one
+        """
+        match = self._waiting
+        if match is not None:
+            self._waiting = None
+            return match, 2
+        match = Match(self._next_id)
+        self._next_id += 1
+        self._matches[match.match_id] = match
+        self._waiting = match
+        return match, 1
+
+    def close(self, match: Match):
+        self._matches.pop(match.match_id, None)
+        if self._waiting is match:
+            self._waiting = None
+
+
+def frame(delivery: Delivery) -> bytes:
+    return f"{delivery.src}\t{delivery.payload}\n".encode()
+
+
+def unframe(line: str) -> Delivery:
+    src, _, payload = line.partition("\t")
+    return Delivery(int(src), payload)
+
+
+class GameServer:
+    def __init__(self):
+        """
+        Hosts every match on one asyncio event loop. Connections speak
+        newline-delimited messages: the server first sends the player id,
+        then "src<TAB>payload" lines; clients send bare payload lines.
+        """
+        self._lobby = Lobby()
+        self._seats: dict[int, dict[int, asyncio.StreamWriter]] = {}
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self._on_connect, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def _on_connect(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        match, player_id = self._lobby.join()
+        seats = self._seats.setdefault(match.match_id, {})
+        seats[player_id] = writer
+        writer.write(f"{player_id}\n".encode())
+        try:
+            while line := await reader.readline():
+                try:
+                    payload = line.decode().rstrip("\n")
+                except ValueError:
+                    continue  # Not UTF-8, so no message of ours
+                for recipient, delivery in match.handle(player_id, payload):
+                    data = frame(delivery)
+                    if recipient is None:
+                        for seat in seats.values():
+                            seat.write(data)
+                    elif recipient in seats:
+                        seats[recipient].write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            seats.pop(player_id, None)
+            if not seats:
+                self._seats.pop(match.match_id, None)
+                self._lobby.close(match)
+            writer.close()
+
+
+class ServerNetwork:
+    def __init__(self, sock: socket.socket, player_id: int, buffered: bytes = b""):
+        """
+        Client side of a GameServer connection, with the same
+        player_id / send / recv surface as CS150241ProjectNetworking
+        """
+        self._sock = sock
+        self._player_id = player_id
+        self._buffer = buffered
+
+    @classmethod
+    def connect(cls, host: str, port: int) -> "ServerNetwork":
+        sock = socket.create_connection((host, port))
+        buffer = b""
+        while b"\n" not in buffer:
+            data = sock.recv(4096)
+            if not data:
+                raise ConnectionError("server closed before seating the player")
+            buffer += data
+        line, _, rest = buffer.partition(b"\n")
+        return cls(sock, int(line), rest)
+
+    @property
+    def player_id(self) -> int:
+        return self._player_id
+
+    def send(self, payload: str):
+        self._sock.sendall(f"{payload}\n".encode())
+
+    def recv(self) -> list[Delivery]:
+        sock = self._sock
+        while select.select([sock], [], [], 0)[0]:
+            data = sock.recv(4096)
+            if not data:
+                break
+            self._buffer += data
+        *lines, self._buffer = self._buffer.split(b"\n")
+        return [unframe(line.decode()) for line in lines]
+
+
+class LoopbackServer:
+    def __init__(self):
+        """
+        In-process stand-in for GameServer: same matches and rules,
+        no sockets. Safe to use from several client threads.
+        """
+        self._lobby = Lobby()
+        self._lock = threading.Lock()
+        self._seats: dict[int, dict[int, deque[Delivery]]] = {}
+
+    @property
+    def lobby(self) -> Lobby:
+        return self._lobby
+
+    def connect(self) -> "LoopbackNetwork":
+        with self._lock:
+            match, player_id = self._lobby.join()
+            inbox: deque[Delivery] = deque()
+            self._seats.setdefault(match.match_id, {})[player_id] = inbox
+        return LoopbackNetwork(self, match, player_id, inbox)
+
+    def close(self, match: Match):
+        with self._lock:
+            self._seats.pop(match.match_id, None)
+            self._lobby.close(match)
+
+    def deliver(self, match: Match, player_id: int, payload: str):
+        with self._lock:
+            seats = self._seats[match.match_id]
+            for recipient, delivery in match.handle(player_id, payload):
+                if recipient is None:
+                    for inbox in seats.values():
+                        inbox.append(delivery)
+                elif recipient in seats:
+                    seats[recipient].append(delivery)
+
+
+class LoopbackNetwork:
+    def __init__(
+        self,
+        server: LoopbackServer,
+        match: Match,
+        player_id: int,
+        inbox: deque[Delivery],
+    ):
+        self._server = server
+        self._match = match
+        self._player_id = player_id
+        self._inbox = inbox
+
+    @property
+    def player_id(self) -> int:
+        return self._player_id
+
+    @property
+    def match(self) -> Match:
+        return self._match
+
+    def send(self, payload: str):
+        self._server.deliver(self._match, self._player_id, payload)
+
+    def recv(self) -> list[Delivery]:
+        inbox = self._inbox
+        messages: list[Delivery] = []
+        while inbox:
+            messages.append(inbox.popleft())
+        return messages
+
+
+def benchmark(matches: int, seconds: float, seed: int = 0):
+    """
+    Random legal play in many loopback matches at once, each action
+    going through the server's validation and broadcast. Finished
+    matches are replaced by new ones
+    """
+    rng = random.Random(seed)
+    server = LoopbackServer()
+    pairs = [(server.connect(), server.connect()) for _ in range(matches)]
+    moves = 0
+    games = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for index, (network1, network2) in enumerate(pairs):
+            engine = network1.match.engine  # Stands in for the client's model
+            actions = engine.legal_actions() if not engine.over else []
+            if not actions:
+                moves += network1.match.moves
+                games += 1
+                server.close(network1.match)
+                pairs[index] = (server.connect(), server.connect())
+                continue
+            network = network1 if engine.curr_player == Team.Player1 else network2
+            action = rng.choice(actions)
+            record = engine.play(action)  # Checksum of the state it leads to
+            key = engine.model.zobrist_key
+            engine.unplay(record)
+            network.send(encode_action(action, network.player_id, 0, key))
+            network1.recv()
+            network2.recv()
+    elapsed = time.perf_counter() - start
+    moves += sum(network1.match.moves for network1, _ in pairs)
+    print(f"{matches} concurrent matches, {games} finished, {moves} moves")
+    print(f"{moves / elapsed:.0f} moves/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=15001)
+    parser.add_argument(
+        "--bench", type=int, metavar="MATCHES", help="benchmark over loopback"
+    )
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    if args.bench:
+        benchmark(args.bench, args.seconds)
+        return
+    asyncio.run(GameServer().serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
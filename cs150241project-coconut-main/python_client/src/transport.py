@@ -0,0 +1,110 @@
+import queue
+import threading
+from typing import Callable, Iterable, NamedTuple, Protocol
+from project_types import NetworkMessage
+from wire import ACTION_PREFIX, ActionMessage, decode_action
+
+
+class Network(Protocol):
+    @property
+    def player_id(self) -> int: ...
+
+    def send(self, payload: str): ...
+
+    def recv(self) -> Iterable[NetworkMessage]: ...
+
+
+class Inbound(NamedTuple):
+    """
+    Received message, with its action already decoded when it carries one
+    """
+
+    src: int
+    payload: str
+    action: ActionMessage | None
+
+
+class Transport(Protocol):
+    @property
+    def player_id(self) -> int: ...
+
+    def send(self, payload: str): ...
+
+    def recv(self) -> list[Inbound]: ...
+
+
+def decode(message: NetworkMessage) -> Inbound:
+    payload = message.payload
+    action = None
+    if payload.startswith(ACTION_PREFIX):
+        try:
+            action = decode_action(payload)
+        except ValueError:
+            pass  # Not from a client speaking this protocol
+        if action is not None and action.player != message.src:
+            action = None  # Claims to be from the other player
+    return Inbound(message.src, payload, action)
+
+
+class ThreadedTransport:
+    def __init__(self, network: Network, poll_interval: float = 0.005):
+        """
+        Owns the network on a dedicated I/O thread.
+        send() only queues the payload and recv() only drains messages the
+        thread has already decoded, so the render loop never waits on I/O.
+        """
+        self._network = network
+        self._poll_interval = poll_interval
+        self._outbox: queue.Queue[str] = queue.Queue()
+        self._inbox: queue.Queue[Inbound] = queue.Queue()
+        self._wakeup: Callable[[], None] | None = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+
+    @property
+    def player_id(self) -> int:
+        return self._network.player_id
+
+    def start(self, wakeup: Callable[[], None] | None = None):
+        """
+        Starts the I/O thread, wakeup is called from it whenever
+        messages are ready
+        """
+        self._wakeup = wakeup
+        self._thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def send(self, payload: str):
+        self._outbox.put(payload)
+
+    def recv(self) -> list[Inbound]:
+        messages: list[Inbound] = []
+        while True:
+            try:
+                messages.append(self._inbox.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _work(self):
+        network = self._network
+        outbox = self._outbox
+        while not self._stop.is_set():
+            try:
+                # Sleeps here between polls, but sends go out at once
+                payload = outbox.get(timeout=self._poll_interval)
+                network.send(payload)
+                while not outbox.empty():
+                    network.send(outbox.get_nowait())
+            except queue.Empty:
+                pass
+
+            received = False
+            for message in network.recv():
+                self._inbox.put(decode(message))
+                received = True
+            if received and self._wakeup is not None:
+                self._wakeup()
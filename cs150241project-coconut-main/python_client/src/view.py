@@ -2,17 +2,38 @@ import pygame
 
 pygame.init()
 from project_types import (
-    Piece,
-    GameStateProtocol,
+    PieceView,
+    GameSnapshot,
     ClickObserver,
     Location,
     GridID,
     Team,
+    Action,
+    ActionObserver,
+    ComputerActionObserver,
+    ComputerActionSource,
     GameStateInitializeObserver,
+    HintObserver,
+    HintSource,
+    Hint,
     PieceID,
 )
-from cs150241project_networking import CS150241ProjectNetworking
-import copy
+from transport import Inbound, Transport
+from assets import SpriteCache, TokenAtlas, TextCache
+from layout import CellKey, Layout
+from wire import (
+    BINARY_PREFIX,
+    DIFF_PREFIX,
+    REJECT_PREFIX,
+    SERVER_ID,
+    TEXT_PREFIX,
+    STATE_REQUEST,
+    ActionMessage,
+    encode_action,
+    state_request,
+)
+from collections import deque
+import time
 
 
 class GameScreen:
@@ -37,45 +58,134 @@ class GameScreen:
     def fill(self):
         self._screen.fill(self._color)
 
-    def update(self):
-        pygame.display.flip()
+    def fill_rect(self, rect: pygame.Rect):
+        self._screen.fill(self._color, rect)
+
+    def update(self, rects: list[pygame.Rect] | None = None):
+        """
+        Flips the whole display, or only pushes the given rects when provided
+        """
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
+
+
+CellLook = tuple[str, PieceID | None, Team | None]
+HudLook = tuple[Team, int, Team | None]
 
 
 class GameView:
-    def __init__(self, state: GameStateProtocol, network: CS150241ProjectNetworking):
+    def __init__(
+        self,
+        state: GameSnapshot,
+        network: Transport,
+        incremental: bool = True,
+        event_driven: bool = True,
+    ):
         self._gscreen = GameScreen(1200, 800)
         self._clock = pygame.time.Clock()
         self._fps = 60
         self._init_sizes()
+        self._init_assets()
+        self._init_render_state(incremental)
+        self._init_loop_state(event_driven)
         self._click_observers: list[ClickObserver] = []
         self._initilize_game_observer: list[GameStateInitializeObserver] = []
-        self._init_view_state(state)
+        self._action_observers: list[ActionObserver] = []
+        self._hint_observers: list[HintObserver] = []
+        self._hint_sources: list[HintSource] = []
+        self._computer_observers: list[ComputerActionObserver] = []
+        self._computer_sources: list[ComputerActionSource] = []
+        self._show_hints = False
+        self._hint: Hint | None = None
         self._network = network
-        Teamid = {1: Team.Player1, 2: Team.Player2}
-        self._playerid = Teamid[network.player_id]
+        self._teamid = {1: Team.Player1, 2: Team.Player2}
+        self._playerid = self._teamid[network.player_id]
+        self._init_view_state(state)
 
-    def _init_view_state(self, state: GameStateProtocol):  # New game
-        self._board_state = copy.deepcopy(state.board_state)
-        self._captured1_state = copy.deepcopy(state.captured1_state)
-        self._captured2_state = copy.deepcopy(state.captured2_state)
+    def _init_view_state(self, state: GameSnapshot):  # New game
+        self._board_state = state.board_state
+        self._captured1_state = state.captured1_state
+        self._captured2_state = state.captured2_state
         self._chosen_piece = state.chosen_piece
         self._possible_move = state.possible_move
         self._curr_player = state.curr_player
         self._moves_left = state.moves_left
         self._winner = state.winner
+        self._refresh_highlights()
+
+    def _init_sizes(self, box_xlen: int = 75, box_ylen: int = 75):
+        self._icon_margin = 26
+        self._layout = Layout(self._gscreen.xlen, box_xlen, box_ylen)
+
+    def _init_assets(self):
+        self._text = TextCache()
+        self._sprites = SpriteCache(self._icon_size())
+        self._tokens = TokenAtlas(
+            self._sprites,
+            (self._layout.box_xlen, self._layout.box_ylen),
+            {Team.Player1: "blue", Team.Player2: "red"},
+        )
 
-    def _init_sizes(self):
-        self._gap_size = 2
-        self._box_xlen = 75
-        self._box_ylen = 75
-        self._board_ystart = 100
-        self._board_xstart = (
-            self._gscreen.xlen - (5 * (self._box_xlen + self._gap_size))
-        ) // 2
-        self._captured_xstart = {
-            0: (self._box_xlen + self._gap_size),
-            1: self._gscreen.xlen - (4 * (self._box_xlen + self._gap_size)),
-        }
+    def _init_render_state(self, incremental: bool):
+        """
+        Bookkeeping for dirty-rectangle rendering.
+        Remembers what every cell and the HUD last looked like on screen
+        """
+        self._incremental = incremental
+        self._cells: list[CellKey] = self._layout.cells
+        self._drawn_looks: dict[CellKey, CellLook] = {}
+        self._drawn_hud: HudLook | None = None
+        self._dirty_cells: set[CellKey] = set()
+        self._hud_dirty = True
+        self._full_redraw = True
+
+    def _init_loop_state(self, event_driven: bool):
+        """
+        Pacing of the main loop. In event-driven mode the loop sleeps
+        until input arrives, polling the network at idle_fps once idle
+        """
+        self._event_driven = event_driven
+        self._idle_fps = 4
+        self._idle_after_ms = 2000
+        self._last_activity = pygame.time.get_ticks()
+        self._inbox: deque[Inbound] = deque()
+        self._message_budget = 0.004  # Seconds of message handling per frame
+        if event_driven:
+            pygame.event.set_blocked(pygame.MOUSEMOTION)
+
+    def _icon_size(self) -> tuple[int, int]:
+        return (
+            self._layout.box_xlen - self._icon_margin,
+            self._layout.box_ylen - self._icon_margin,
+        )
+
+    def resize_boxes(self, box_xlen: int, box_ylen: int):
+        """
+        Changes the box size, rebuilding the layout and scaled icons
+        """
+        self._init_sizes(box_xlen, box_ylen)
+        self._sprites.resize(self._icon_size())
+        self._tokens.resize((self._layout.box_xlen, self._layout.box_ylen))
+        self._full_redraw = True
+
+    @property
+    def playerid(self) -> Team:
+        return self._playerid
+
+    def send_action(self, action: Action, seq: int, key: int):
+        """
+        Sends a committed action of this player to both players,
+        with the Zobrist key of the state it leads to
+        """
+        self._network.send(encode_action(action, self._network.player_id, seq, key))
+
+    def send_state_request(self, state: GameSnapshot | None = None):
+        self._network.send(state_request(state))
+
+    def send_state(self, payload: str):
+        self._network.send(payload)
 
     def register_on_click_observer(self, observer: ClickObserver):
         self._click_observers.append(observer)
@@ -85,188 +195,277 @@ class GameView:
     ):
         self._initilize_game_observer.append(observer)
 
+    def register_action_observer(self, observer: ActionObserver):
+        self._action_observers.append(observer)
+
+    def register_hint_observer(self, observer: HintObserver):
+        self._hint_observers.append(observer)
+
+    def register_hint_source(self, source: HintSource):
+        self._hint_sources.append(source)
+
+    def register_computer_observer(self, observer: ComputerActionObserver):
+        self._computer_observers.append(observer)
+
+    def register_computer_source(self, source: ComputerActionSource):
+        self._computer_sources.append(source)
+
+    def wake(self):
+        """
+        Wakes the event-driven loop, safe to call from any thread
+        """
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+
+    def _toggle_hints(self):
+        self._show_hints = not self._show_hints
+        self._hint = None
+        self._refresh_highlights()
+        self._mark_dirty()
+        for observer in self._hint_observers:
+            observer.on_hint_request(self._show_hints)
+
+    def _poll_hints(self):
+        """
+        Picks up finished analyses without ever waiting on them
+        """
+        for source in self._hint_sources:
+            hint = source.poll()
+            if hint is not None and self._show_hints:
+                self._hint = hint
+                self._refresh_highlights()
+                self._mark_dirty()
+
+    def _poll_computer(self):
+        """
+        Hands finished computer searches to the observers
+        """
+        for source in self._computer_sources:
+            action = source.poll()
+            if action is None:
+                continue
+            for observer in self._computer_observers:
+                observer.on_computer_action(action)
+
     def _on_click(self, location: Location | None):
         for observer in self._click_observers:
             observer.on_click(location)
 
+    def _on_action(self, message: ActionMessage, src: int):
+        sender = self._teamid.get(src)
+        for observer in self._action_observers:
+            observer.on_action(
+                message.action, sender, message.seq, message.checksum
+            )
+
     def _initialize_p2(self, strgamestate: str):
         for observer in self._initilize_game_observer:
             observer.initialize_p2_game(strgamestate)
 
-    def on_state_change(self, state: GameStateProtocol):
-        self._board_state = copy.deepcopy(state.board_state)
-        self._captured1_state = copy.deepcopy(state.captured1_state)
-        self._captured2_state = copy.deepcopy(state.captured2_state)
+    def on_state_change(self, state: GameSnapshot):
+        if self._position_changed(state):
+            self._hint = None
+        self._board_state = state.board_state
+        self._captured1_state = state.captured1_state
+        self._captured2_state = state.captured2_state
         self._chosen_piece = state.chosen_piece
         self._possible_move = state.possible_move
         self._curr_player = state.curr_player
         self._moves_left = state.moves_left
         self._winner = state.winner
+        self._refresh_highlights()
+        self._mark_dirty()
+        self._last_activity = pygame.time.get_ticks()
 
-    def run(self):
+    def _position_changed(self, state: GameSnapshot) -> bool:
+        """
+        Whether pieces or the turn differ from the shown state.
+        Snapshots share unchanged rows, so comparing rows by identity is enough
+        """
+        if (state.curr_player, state.moves_left) != (
+            self._curr_player,
+            self._moves_left,
+        ):
+            return True
+        pairs = (
+            (state.board_state, self._board_state),
+            (state.captured1_state, self._captured1_state),
+            (state.captured2_state, self._captured2_state),
+        )
+        return any(
+            new is not old
+            for rows, old_rows in pairs
+            for new, old in zip(rows, old_rows)
+        )
+
+    def _mark_dirty(self):
+        """
+        Collects the cells and HUD whose look differs from what is on screen
+        """
+        for gridid, i, j in self._cells:
+            if self._drawn_looks.get((gridid, i, j)) != self._cell_look(i, j, gridid):
+                self._dirty_cells.add((gridid, i, j))
+        if self._drawn_hud != self._hud_look():
+            self._hud_dirty = True
+
+    def _has_pending_draw(self) -> bool:
+        return self._full_redraw or bool(self._dirty_cells) or self._hud_dirty
+
+    def _poll_events(self) -> list[pygame.event.Event]:
+        """
+        Gets pending events. In event-driven mode, blocks until an event
+        arrives or it is time to poll the network again
+        """
+        if not self._event_driven or self._inbox:
+            return pygame.event.get()  # Carried-over messages must not wait
+
+        idle = pygame.time.get_ticks() - self._last_activity > self._idle_after_ms
+        fps = self._idle_fps if idle else self._fps
+        first = pygame.event.wait(1000 // fps)
+        if first.type == pygame.NOEVENT:
+            return []
+        self._last_activity = pygame.time.get_ticks()
+        return [first] + pygame.event.get()
+
+    def _hud_look(self) -> HudLook:
+        return (self._curr_player, self._moves_left, self._winner)
+
+    def _hud_rects(self) -> list[pygame.Rect]:
+        """
+        Screen areas holding HUD text, which never overlap the grids
+        """
+        layout = self._layout
+        xlen = self._gscreen.xlen
+        stride = layout.ystride
+        board_xstart = layout.xstart(GridID.BOARD)
+        board_xend = board_xstart + 5 * layout.xstride
+        under_ystart = layout.ystart + stride * 2
+        return [
+            pygame.Rect(0, 0, xlen, layout.ystart),
+            pygame.Rect(0, under_ystart, board_xstart, stride * 2),
+            pygame.Rect(board_xend, under_ystart, xlen - board_xend, stride * 2),
+            pygame.Rect(0, layout.ystart + stride * 6, xlen, stride),
+        ]
+
+    def _render(self):
+        """
+        Draws the frame, repainting everything or only what changed
+        """
         gscreen = self._gscreen
+        if not self._incremental or self._full_redraw:
+            gscreen.fill()
+            self._display()
+            self._display_hud()
+            self._full_redraw = False
+            self._dirty_cells.clear()
+            self._hud_dirty = False
+            gscreen.update()
+            return
+
+        rects: list[pygame.Rect] = []
+        for cell in self._dirty_cells:
+            gridid, i, j = cell
+            self._display_grid(i, j, gridid)
+            rects.append(self._cell_rect(i, j, gridid))
+        self._dirty_cells.clear()
+
+        if self._hud_dirty:
+            hud_rects = self._hud_rects()
+            for rect in hud_rects:
+                gscreen.fill_rect(rect)
+            self._display_hud()
+            rects.extend(hud_rects)
+            self._hud_dirty = False
+
+        gscreen.update(rects)
+
+    def _display_hud(self):
+        self._display_overhead()
+        self._display_underhead()
+        if self._winner:
+            self._display_winner()
+        self._drawn_hud = self._hud_look()
+
+    def _process_messages(self):
+        """
+        Handles every received message in arrival order. Once a frame's
+        budget is spent the rest waits in the inbox for the next frame
+        """
+        inbox = self._inbox
+        inbox.extend(self._network.recv())
+        deadline = time.perf_counter() + self._message_budget
+        while inbox:
+            self._handle_message(inbox.popleft())
+            if time.perf_counter() > deadline:
+                break
+
+    def _handle_message(self, message: Inbound):
+        payload = message.payload
+        if not payload:
+            return
+        own = message.src == self._network.player_id  # Relays echo to the sender
+        if payload.startswith(STATE_REQUEST):
+            for observer in self._initilize_game_observer:
+                if own:
+                    observer.on_state_request_echo()
+                else:
+                    observer.on_state_request(payload)
+        elif payload[0] in (TEXT_PREFIX, BINARY_PREFIX, DIFF_PREFIX):
+            if not own:
+                self._initialize_p2(payload)
+        elif message.action is not None:
+            self._on_action(message.action, message.src)
+        elif (
+            message.src == SERVER_ID  # Never a peer's, it could roll us back
+            and payload[0] == REJECT_PREFIX
+            and payload[1:].isdigit()
+        ):
+            for observer in self._action_observers:
+                observer.on_reject(int(payload[1:]))
+
+    def run(self):
         clock = self._clock
         running = True
-        latest_message = None
-        started = True
         while running:
-            for event in pygame.event.get():
+            for event in self._poll_events():
                 if event.type == pygame.QUIT:
                     running = False
+                if event.type == pygame.WINDOWEXPOSED:
+                    self._full_redraw = True
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                    self._toggle_hints()
                 if (
                     event.type == pygame.MOUSEBUTTONDOWN
                     and event.button == 1
                     and self._playerid == self._curr_player
                 ):
-                    # Get mouse position
-                    mouse_pos = event.pos
-                    self._network.send(str(mouse_pos))
+                    # Selection is resolved locally, only actions are sent
+                    self._get_click_info(*event.pos)
 
-            if self._playerid == Team.Player2 and started:
-                started = False
-                self._network.send("get")
+            self._poll_hints()
+            self._poll_computer()
 
             # For Recieving from network
-            for m in self._network.recv():
-                latest_message = m
-            if latest_message is not None:
-                if latest_message.payload == "get":
-                    if self._playerid == Team.Player1:
-                        self._send_gamestate_message()
-                    else:
-                        pass
-                elif latest_message.payload[0] == "#":
-                    self._initialize_p2(latest_message.payload[1:])
-                else:
-                    mouse_int = self._str_to_pos(latest_message.payload)
-                    self._get_click_info(mouse_int[0], mouse_int[1])
-                latest_message = None
-
-            gscreen.fill()
-
-            self._display()
-            self._display_overhead()
-            self._display_underhead()
-            if self._winner:
-                self._display_winner()
+            self._process_messages()
 
-            gscreen.update()
+            if not self._event_driven or self._has_pending_draw():
+                self._render()
             clock.tick(self._fps)
 
-    def _str_to_pos(self, input_str: str) -> tuple[int, int]:
-        """
-        Converts the string message into mouse position
-        """
-        stripped = input_str.strip("()")
-        parts = stripped.split(",")
-        return int(parts[0].strip()), int(parts[1].strip())
-
-    def _send_gamestate_message(self):
-        """
-        Converts the GameState into a string message
-        """
-
-        def piece_to_char(piece: Piece | None):
-            if piece is None:
-                return "N"
-            match piece.pieceid:
-                case PieceID.CENTAUR:
-                    return "C" + team_to_char(piece.team)
-                case PieceID.DRAGON:
-                    return "D" + team_to_char(piece.team)
-                case PieceID.GOBLIN:
-                    return "G" + team_to_char(piece.team)
-                case PieceID.SLIME:
-                    return "S" + team_to_char(piece.team)
-                case PieceID.SUMMONER:
-                    return "K" + team_to_char(piece.team)
-
-        def team_to_char(team: Team | None):
-            if team is None:
-                return "P0"
-            match team:
-                case Team.Player1:
-                    return "P1"
-                case Team.Player2:
-                    return "P2"
-                case _:
-                    return "P0"
-
-        def grid_to_char(grid: GridID | None):
-            match grid:
-                case GridID.BOARD:
-                    return "BO"
-                case GridID.CAPTURED1:
-                    return "C1"
-                case GridID.CAPTURED2:
-                    return "C2"
-                case _:
-                    return "//"
-
-        def chosen_piece_to_char(piece: Piece | None):
-            if piece is None:
-                return "N"
-            match piece.pieceid:
-                case PieceID.CENTAUR:
-                    piecechar = "C"
-                case PieceID.DRAGON:
-                    piecechar = "D"
-                case PieceID.GOBLIN:
-                    piecechar = "G"
-                case PieceID.SLIME:
-                    piecechar = "S"
-                case PieceID.SUMMONER:
-                    piecechar = "K"
-            return (
-                piecechar
-                + team_to_char(piece.team)
-                + grid_to_char(piece.gridid)
-                + str(piece.loci)
-                + str(piece.locj)
-            )
-
-        message = "#"
-
-        for row in self._board_state:
-            for piece in row:
-                message = message + piece_to_char(piece) + ","
-            message = message + ";"
-        message = message + "#"
-
-        for piece in self._captured1_state[0]:
-            message = message + piece_to_char(piece) + ","
-        message = message + "#"
-
-        for piece in self._captured2_state[0]:
-            message = message + piece_to_char(piece) + ","
-        message = message + "#"
-
-        message += chosen_piece_to_char(self._chosen_piece)
-        message = message + "#"
-        for loc in self._possible_move:
-            message += str(loc[0]) + str(loc[1]) + ","
-        message = message + "#"
-
-        message += team_to_char(self._curr_player)
-        message = message + "#"
-        message += str(self._moves_left)
-        message = message + "#"
-        message += team_to_char(self._winner)
-
-        self._network.send(message)
-
     def _display_winner(self):
         """
         Displays winner on screen
         """
-        font = pygame.font.SysFont("", 40)
         if self._winner == Team.Neutral:
-            text_obj = font.render(f"Draw!", True, "white")
+            text_obj = self._text.render(f"Draw!", 40, "white")
         else:
             if self._winner == Team.Player1:
-                text_obj = font.render(f"Winner: {self._winner.value}", True, "blue")
+                text_obj = self._text.render(
+                    f"Winner: {self._winner.value}", 40, "blue"
+                )
             elif self._winner == Team.Player2:
-                text_obj = font.render(f"Winner: {self._winner.value}", True, "red")
+                text_obj = self._text.render(
+                    f"Winner: {self._winner.value}", 40, "red"
+                )
             else:
                 return
 
@@ -274,81 +473,73 @@ class GameView:
         screenx = self._gscreen.xlen
         self._gscreen.screen.blit(
             text_obj,
-            (screenx // 2 - xtext // 2, 100 + (self._box_ylen + self._gap_size) * 6),
+            (screenx // 2 - xtext // 2, self._layout.ystart + self._layout.ystride * 6),
         )
 
     def _display_overhead(self):
         """
         Displays the Players above the captured grids.
         """
-        font = pygame.font.SysFont("", 40)
         if self._curr_player == Team.Player1:
-            text_obj1 = font.render(f"Player 1", True, "white")
+            text_obj1 = self._text.render(f"Player 1", 40, "white")
         else:
-            text_obj1 = font.render(f"Player 1", True, "blue")
+            text_obj1 = self._text.render(f"Player 1", 40, "blue")
         if self._curr_player == Team.Player2:
-            text_obj2 = font.render(f"Player 2", True, "white")
+            text_obj2 = self._text.render(f"Player 2", 40, "white")
         else:
-            text_obj2 = font.render(f"Player 2", True, "red")
-        text_obj3 = font.render(f"Summoner's Gridlock", True, "white")
+            text_obj2 = self._text.render(f"Player 2", 40, "red")
+        text_obj3 = self._text.render(f"Summoner's Gridlock", 40, "white")
         
         _, ytext = text_obj1.get_size()
         titlex, _ = text_obj3.get_size()
-        grave1l = self._captured_xstart[0]
-        grave2l = self._captured_xstart[1]
+        grave1l = self._layout.xstart(GridID.CAPTURED1)
+        grave2l = self._layout.xstart(GridID.CAPTURED2)
+        ystart = self._layout.ystart
         screenx = self._gscreen.xlen
         # screeny = self._gscreen.ylen
         self._gscreen.screen.blit(
-            text_obj1, (grave1l, self._board_ystart - (ytext + 2))
+            text_obj1, (grave1l, ystart - (ytext + 2))
         )
         self._gscreen.screen.blit(
-            text_obj2, (grave2l, self._board_ystart - (ytext + 2))
+            text_obj2, (grave2l, ystart - (ytext + 2))
         )
         self._gscreen.screen.blit(
-            text_obj3, ((screenx//2) - (titlex//2), self._board_ystart //2)
+            text_obj3, ((screenx//2) - (titlex//2), ystart //2)
         )
 
     def _display_underhead(self):
         """
         Displays extra information below capture grids
         """
-        font = pygame.font.SysFont("", 30)
         if self._curr_player == Team.Player1:
-            text_obj1 = font.render(
-                f"Current Moves Left: {self._moves_left}", True, "white"
+            text_obj1 = self._text.render(
+                f"Current Moves Left: {self._moves_left}", 30, "white"
             )
         else:
-            text_obj1 = font.render(f"Current Moves Left: 0", True, "blue")
+            text_obj1 = self._text.render(f"Current Moves Left: 0", 30, "blue")
         if self._curr_player == Team.Player2:
-            text_obj2 = font.render(
-                f"Current Moves Left: {self._moves_left}", True, "white"
+            text_obj2 = self._text.render(
+                f"Current Moves Left: {self._moves_left}", 30, "white"
             )
         else:
-            text_obj2 = font.render(f"Current Moves Left: 0", True, "red")
+            text_obj2 = self._text.render(f"Current Moves Left: 0", 30, "red")
         if self._playerid == Team.Player1:
-            text_obj3 = font.render(f"You are {self._playerid}", True, "blue")
-            graveside = self._captured_xstart[0]
+            text_obj3 = self._text.render(f"You are {self._playerid}", 30, "blue")
+            graveside = self._layout.xstart(GridID.CAPTURED1)
         else:
-            text_obj3 = font.render(f"You are {self._playerid}", True, "red")
-            graveside = self._captured_xstart[1]
+            text_obj3 = self._text.render(f"You are {self._playerid}", 30, "red")
+            graveside = self._layout.xstart(GridID.CAPTURED2)
 
         _, _ = text_obj1.get_size()
-        grave1l = self._captured_xstart[0]
-        grave2l = self._captured_xstart[1]
+        grave1l = self._layout.xstart(GridID.CAPTURED1)
+        grave2l = self._layout.xstart(GridID.CAPTURED2)
+        ystart = self._layout.ystart
+        stride = self._layout.ystride
         # screenx = self._gscreen.xlen
         # screeny = self._gscreen.ylen
-        self._gscreen.screen.blit(
-            text_obj1,
-            (grave1l, self._board_ystart + ((self._box_ylen + self._gap_size) * 2)),
-        )
-        self._gscreen.screen.blit(
-            text_obj2,
-            (grave2l, self._board_ystart + ((self._box_ylen + self._gap_size) * 2)),
-        )
-        self._gscreen.screen.blit(
-            text_obj3,
-            (graveside, self._board_ystart + ((self._box_ylen + self._gap_size) * 3)),
-        )
+        self._gscreen.screen.blit(text_obj1, (grave1l, ystart + stride * 2))
+        self._gscreen.screen.blit(text_obj2, (grave2l, ystart + stride * 2))
+        self._gscreen.screen.blit(text_obj3, (graveside, ystart + stride * 3))
 
     def _get_click_info(self, mouse_x: int, mouse_y: int):
         """
@@ -356,54 +547,8 @@ class GameView:
         """
         if self._winner:  # Freeze
             return
-        grave1l = self._captured_xstart[0]
-        grave1r = grave1l + (3 * self._box_xlen + 2 * self._gap_size)
-        boardl = self._board_xstart
-        boardr = boardl + (5 * self._box_xlen + 4 * self._gap_size)
-        grave2l = self._captured_xstart[1]
-        grave2r = grave2l + (3 * self._box_xlen + 2 * self._gap_size)
-        if grave1l <= mouse_x and mouse_x <= grave1r:
-            gridid = GridID.CAPTURED1
-            coord = self._get_location(self._captured1_state, grave1l, mouse_x, mouse_y)
-        elif boardl <= mouse_x and mouse_x <= boardr:
-            gridid = GridID.BOARD
-            coord = self._get_location(self._board_state, boardl, mouse_x, mouse_y)
-        elif grave2l <= mouse_x and mouse_x <= grave2r:
-            gridid = GridID.CAPTURED2
-            coord = self._get_location(self._captured2_state, grave2l, mouse_x, mouse_y)
-        else:
-            gridid = GridID.BOARD
-            coord = None
-
-        if not coord:
-            location = None
-        else:
-            location = Location(gridid, coord[0], coord[1])
-        self._on_click(location)
-
-    def _get_location(
-        self, grid: list[list[None | Piece]], xstart: int, mouse_x: int, mouse_y: int
-    ) -> tuple[int, int] | None:
-        """
-        Acquires grid index of click location
-        """
-        row = len(grid)
-        col = len(grid[0])
-        y = self._board_ystart
-        for i in range(row):
-            x = xstart
-            for j in range(col):
-                if (
-                    x <= mouse_x
-                    and mouse_x <= x + self._box_xlen
-                    and y <= mouse_y
-                    and mouse_y <= y + self._box_ylen
-                ):
-                    return (i, j)
-
-                x = x + (self._box_xlen + self._gap_size)
-            y = y + (self._box_ylen + self._gap_size)
-        return None
+        cell = self._layout.hit(mouse_x, mouse_y)
+        self._on_click(Location(*cell) if cell else None)
 
     def _display(self):
         """
@@ -418,75 +563,63 @@ class GameView:
             for j in range(5):  # Specifications
                 self._display_grid(i, j, GridID.BOARD)
 
-    def _display_grid(self, i: int, j: int, gridid: GridID):
-        """
-        Displays grids for both Captured and board.
-        Correctly shows color depending on the GameState
-        """
+    def _cell_piece(self, i: int, j: int, gridid: GridID) -> PieceView | None:
         match gridid:
             case GridID.CAPTURED1:
-                piece = self._captured1_state[i][j]
-                xstart = self._captured_xstart[0]
+                return self._captured1_state[i][j]
             case GridID.CAPTURED2:
-                piece = self._captured2_state[i][j]
-                xstart = self._captured_xstart[1]
+                return self._captured2_state[i][j]
             case GridID.BOARD:
-                piece = self._board_state[i][j]
-                xstart = self._board_xstart
-
-        x = xstart + (self._box_xlen + self._gap_size) * j
-        y = self._board_ystart + (self._box_ylen + self._gap_size) * i
-
-        if self._chosen_piece and self._chosen_piece.team == self._playerid:
-            chosen_grid = self._chosen_piece.gridid
-            if (i, j) == (
-                self._chosen_piece.loci,
-                self._chosen_piece.locj,
-            ) and gridid == chosen_grid:
-                pygame.draw.rect(
-                    self._gscreen.screen,
-                    "white",
-                    (x, y, self._box_xlen, self._box_ylen),
-                )
-            elif (i, j) in self._possible_move and gridid == GridID.BOARD:
-                pygame.draw.rect(
-                    self._gscreen.screen,
-                    "yellow",
-                    (x, y, self._box_xlen, self._box_ylen),
-                )
-            else:
-                pygame.draw.rect(
-                    self._gscreen.screen,
-                    "black",
-                    (x, y, self._box_xlen, self._box_ylen),
-                )
-        else:
-            pygame.draw.rect(
-                self._gscreen.screen, "black", (x, y, self._box_xlen, self._box_ylen)
-            )
+                return self._board_state[i][j]
+
+    def _cell_rect(self, i: int, j: int, gridid: GridID) -> pygame.Rect:
+        return self._layout.cell_rect(gridid, i, j)
+
+    def _refresh_highlights(self):
+        """
+        Box colors of the highlighted cells, rebuilt when the chosen piece,
+        its moves or the hint change. The selection wins over the hint
+        """
+        highlights: dict[CellKey, str] = {}
+        hint = self._hint
+        if hint:
+            action = hint.action
+            highlights[(action.gridid, action.fromi, action.fromj)] = "cyan"
+            highlights[(GridID.BOARD, action.toi, action.toj)] = "green"
+        chosen = self._chosen_piece
+        if chosen and chosen.team == self._playerid:
+            for i, j in self._possible_move:
+                highlights[(GridID.BOARD, i, j)] = "yellow"
+            if chosen.gridid is not None:
+                highlights[(chosen.gridid, chosen.loci, chosen.locj)] = "white"
+        self._highlights = highlights
+
+    def _cell_color(self, i: int, j: int, gridid: GridID) -> str:
+        """
+        Box color of a cell depending on the chosen piece and its moves
+        """
+        return self._highlights.get((gridid, i, j), "black")
+
+    def _cell_look(self, i: int, j: int, gridid: GridID) -> CellLook:
+        piece = self._cell_piece(i, j, gridid)
+        if piece is None:
+            return (self._cell_color(i, j, gridid), None, None)
+        return (self._cell_color(i, j, gridid), piece.pieceid, piece.team)
 
-        self._display_pieces(x, y, piece)
+    def _display_grid(self, i: int, j: int, gridid: GridID):
+        """
+        Displays grids for both Captured and board.
+        Correctly shows color depending on the GameState
+        """
+        rect = self._cell_rect(i, j, gridid)
+        pygame.draw.rect(self._gscreen.screen, self._cell_color(i, j, gridid), rect)
+        self._display_pieces(rect.x, rect.y, self._cell_piece(i, j, gridid))
+        self._drawn_looks[(gridid, i, j)] = self._cell_look(i, j, gridid)
 
-    def _display_pieces(self, x: int, y: int, piece: Piece | None):
+    def _display_pieces(self, x: int, y: int, piece: PieceView | None):
         """
         Displays Piece icons with their team color on correct location
         """
         if not piece:
             return
-        sizediff = 26
-        centering = sizediff // 2
-        center_circle = (x + self._box_xlen // 2, y + self._box_ylen // 2)
-        circle_radus = 33
-
-        if piece.team == Team.Player1:
-            team_color = "blue"
-        else:
-            team_color = "red"
-        pygame.draw.circle(
-            self._gscreen.screen, team_color, center_circle, circle_radus
-        )
-        image_path = piece.path
-        image = pygame.image.load(image_path)
-        image_size = (self._box_xlen - sizediff, self._box_ylen - sizediff)
-        image = pygame.transform.scale(image, image_size)
-        self._gscreen.screen.blit(image, (x + centering, y + centering))
+        self._tokens.blit(self._gscreen.screen, (x, y), piece.pieceid, piece.team)
@@ -0,0 +1,358 @@
+import base64
+from typing import NamedTuple, Sequence
+from project_types import (
+    Action,
+    ActionKind,
+    GameSnapshot,
+    GridID,
+    PieceID,
+    PieceView,
+    Team,
+)
+from bitboard import (
+    BOARD_COLS,
+    BOARD_ROWS,
+    CAPTURED_SLOTS,
+    CODE_PIECES,
+    FULL_BOARD,
+    PIECE_CODES,
+)
+
+# Version 1 layout, 23 bytes:
+#   0       WIRE_VERSION
+#   1       curr_player | winner << 2 | moves_left << 4
+#   2..17   one nibble per cell of STATE_CELLS, low nibble first:
+#           PIECE_CODES value, 0 when empty, bit 3 set for Player2
+#   18      chosen cell as grid << 6 | i << 3 | j, NO_CELL when none
+#   19..22  possible_move as a little-endian board bitmask
+WIRE_VERSION = 1
+TEXT_PREFIX = "#"
+BINARY_PREFIX = "!"
+ACTION_PREFIX = "@"
+REJECT_PREFIX = "~"
+DIFF_PREFIX = "%"
+STATE_REQUEST = "get"
+SERVER_ID = 0  # src of messages the server writes itself
+
+STATE_CELLS: list[tuple[GridID, int, int]] = (
+    [(GridID.BOARD, i, j) for i in range(BOARD_ROWS) for j in range(BOARD_COLS)]
+    + [(GridID.CAPTURED1, 0, j) for j in range(CAPTURED_SLOTS)]
+    + [(GridID.CAPTURED2, 0, j) for j in range(CAPTURED_SLOTS)]
+)
+CELL_SET = frozenset(STATE_CELLS)
+CELLS_OFFSET = 2
+CHOSEN_OFFSET = CELLS_OFFSET + (len(STATE_CELLS) + 1) // 2
+MOVES_OFFSET = CHOSEN_OFFSET + 1
+MOVES_BYTES = 4
+STATE_SIZE = MOVES_OFFSET + MOVES_BYTES
+CELLS_SIZE = CHOSEN_OFFSET - CELLS_OFFSET
+
+# Resync diff: WIRE_VERSION, the turn byte, a count, then count pairs of
+# (index into STATE_CELLS, nibble) for the cells that differ
+DIFF_HEADER = 3
+
+NO_CELL = 0xFF
+P2_FLAG = 0x8
+CODE_MASK = 0x7
+
+TEAM_CODES: dict[Team | None, int] = {
+    None: 0,
+    Team.Player1: 1,
+    Team.Player2: 2,
+    Team.Neutral: 3,
+}
+CODE_TEAMS: dict[int, Team | None] = {code: team for team, code in TEAM_CODES.items()}
+GRID_CODES: dict[GridID, int] = {
+    GridID.BOARD: 0,
+    GridID.CAPTURED1: 1,
+    GridID.CAPTURED2: 2,
+}
+CODE_GRIDS: dict[int, GridID] = {code: gridid for gridid, code in GRID_CODES.items()}
+KIND_CODES: dict[ActionKind, str] = {
+    ActionKind.MOVE: "M",
+    ActionKind.CAPTURE: "C",
+    ActionKind.DROP: "D",
+}
+CODE_KINDS: dict[str, ActionKind] = {code: kind for kind, code in KIND_CODES.items()}
+CHECKSUM_DIGITS = 8
+CHECKSUM_MASK = (1 << (4 * CHECKSUM_DIGITS)) - 1
+ACTION_SIZE = len(ACTION_PREFIX) + 7 + CHECKSUM_DIGITS  # Without the sequence number
+
+
+def piece_nibble(pieceid: PieceID, team: Team) -> int:
+    flag = P2_FLAG if team == Team.Player2 else 0
+    return PIECE_CODES[pieceid] | flag
+
+
+def encode_state(state: GameSnapshot) -> bytes:
+    """
+    Packs a snapshot into STATE_SIZE bytes
+    """
+    data = bytearray(STATE_SIZE)
+    data[0] = WIRE_VERSION
+    data[1] = (
+        TEAM_CODES[state.curr_player]
+        | TEAM_CODES[state.winner] << 2
+        | state.moves_left << 4
+    )
+
+    pieces = [piece for row in state.board_state for piece in row]
+    pieces += state.captured1_state[0]
+    pieces += state.captured2_state[0]
+    for index, piece in enumerate(pieces):
+        if piece is not None:
+            nibble = piece_nibble(piece.pieceid, piece.team)
+            data[CELLS_OFFSET + index // 2] |= nibble << (4 * (index & 1))
+
+    chosen = state.chosen_piece
+    if chosen is None or chosen.gridid is None:
+        data[CHOSEN_OFFSET] = NO_CELL
+    else:
+        data[CHOSEN_OFFSET] = (
+            GRID_CODES[chosen.gridid] << 6 | chosen.loci << 3 | chosen.locj
+        )
+
+    mask = state.possible_move.mask
+    data[MOVES_OFFSET:STATE_SIZE] = mask.to_bytes(MOVES_BYTES, "little")
+    return bytes(data)
+
+
+def format_state(state: GameSnapshot) -> str:
+    """
+    Text encoding of a snapshot, the fallback for peers without binary
+    """
+
+    def piece_to_char(piece: PieceView | None):
+        if piece is None:
+            return "N"
+        match piece.pieceid:
+            case PieceID.CENTAUR:
+                return "C" + team_to_char(piece.team)
+            case PieceID.DRAGON:
+                return "D" + team_to_char(piece.team)
+            case PieceID.GOBLIN:
+                return "G" + team_to_char(piece.team)
+            case PieceID.SLIME:
+                return "S" + team_to_char(piece.team)
+            case PieceID.SUMMONER:
+                return "K" + team_to_char(piece.team)
+
+    def team_to_char(team: Team | None):
+        if team is None:
+            return "P0"
+        match team:
+            case Team.Player1:
+                return "P1"
+            case Team.Player2:
+                return "P2"
+            case _:
+                return "P0"
+
+    def grid_to_char(grid: GridID | None):
+        match grid:
+            case GridID.BOARD:
+                return "BO"
+            case GridID.CAPTURED1:
+                return "C1"
+            case GridID.CAPTURED2:
+                return "C2"
+            case _:
+                return "//"
+
+    def chosen_piece_to_char(piece: PieceView | None):
+        if piece is None:
+            return "N"
+        match piece.pieceid:
+            case PieceID.CENTAUR:
+                piecechar = "C"
+            case PieceID.DRAGON:
+                piecechar = "D"
+            case PieceID.GOBLIN:
+                piecechar = "G"
+            case PieceID.SLIME:
+                piecechar = "S"
+            case PieceID.SUMMONER:
+                piecechar = "K"
+        return (
+            piecechar
+            + team_to_char(piece.team)
+            + grid_to_char(piece.gridid)
+            + str(piece.loci)
+            + str(piece.locj)
+        )
+
+    def cells_to_str(row: Sequence[PieceView | None]):
+        return "".join([piece_to_char(piece) + "," for piece in row])
+
+    sections = [
+        "",
+        "".join([cells_to_str(row) + ";" for row in state.board_state]),
+        cells_to_str(state.captured1_state[0]),
+        cells_to_str(state.captured2_state[0]),
+        chosen_piece_to_char(state.chosen_piece),
+        "".join([f"{i}{j}," for i, j in state.possible_move]),
+        team_to_char(state.curr_player),
+        str(state.moves_left),
+        team_to_char(state.winner),
+    ]
+
+    return TEXT_PREFIX.join(sections)
+
+
+def state_request(state: GameSnapshot | None = None) -> str:
+    """
+    Asks for the other side's state, sending the cells we have
+    so only the ones that differ come back.
+    Without a state it asks for the text format, which every peer reads
+    """
+    if state is None:
+        return STATE_REQUEST
+    cells = encode_state(state)[CELLS_OFFSET:CHOSEN_OFFSET]
+    return f"{STATE_REQUEST}:{WIRE_VERSION}:{base64.b64encode(cells).decode('ascii')}"
+
+
+def state_reply(request: str, state: GameSnapshot) -> str:
+    """
+    Answers a state request with a diff against the requester's cells,
+    the full binary state when it only names this WIRE_VERSION and the
+    text format otherwise
+    """
+    versioned = f"{STATE_REQUEST}:{WIRE_VERSION}"
+    if request == versioned:
+        return pack_state(state)
+    if request.startswith(versioned + ":"):
+        try:
+            remote = base64.b64decode(request[len(versioned) + 1 :], validate=True)
+        except ValueError:
+            return pack_state(state)
+        if len(remote) == CELLS_SIZE:
+            return pack_diff(state, remote)
+        return pack_state(state)
+    return format_state(state)
+
+
+def cell_nibble(data: bytes, index: int, offset: int = CELLS_OFFSET) -> int:
+    return data[offset + index // 2] >> (4 * (index & 1)) & 0xF
+
+
+def valid_nibble(nibble: int) -> bool:
+    code = nibble & CODE_MASK
+    return code in CODE_PIECES if code else nibble == 0
+
+
+def valid_turn(turn: int) -> bool:
+    curr_player = CODE_TEAMS[turn & 3]
+    return curr_player in (Team.Player1, Team.Player2) and turn >> 4 <= 3
+
+
+def valid_chosen(chosen: int) -> bool:
+    if chosen == NO_CELL:
+        return True
+    gridid = CODE_GRIDS.get(chosen >> 6)
+    return (gridid, chosen >> 3 & 7, chosen & 7) in CELL_SET
+
+
+def encode_diff(state: GameSnapshot, remote_cells: bytes) -> bytes:
+    """
+    The turn byte and every cell of state that differs from remote_cells
+    """
+    data = encode_state(state)
+    diff = bytearray((WIRE_VERSION, data[1], 0))
+    for index in range(len(STATE_CELLS)):
+        nibble = cell_nibble(data, index)
+        if nibble != cell_nibble(remote_cells, index, 0):
+            diff += bytes((index, nibble))
+    diff[2] = (len(diff) - DIFF_HEADER) // 2
+    return bytes(diff)
+
+
+def pack_diff(state: GameSnapshot, remote_cells: bytes) -> str:
+    diff = encode_diff(state, remote_cells)
+    return DIFF_PREFIX + base64.b64encode(diff).decode("ascii")
+
+
+def unpack_diff(payload: str) -> bytes:
+    """
+    Raw bytes of a payload made by pack_diff, checked for its version
+    and length
+    """
+    data = base64.b64decode(payload[len(DIFF_PREFIX) :], validate=True)
+    if (
+        len(data) < DIFF_HEADER
+        or data[0] != WIRE_VERSION
+        or len(data) != DIFF_HEADER + 2 * data[2]
+    ):
+        raise ValueError("unsupported or truncated state diff")
+    if not valid_turn(data[1]):
+        raise ValueError(f"invalid turn byte {data[1]}")
+    for offset in range(DIFF_HEADER, len(data), 2):
+        if data[offset] >= len(STATE_CELLS) or not valid_nibble(data[offset + 1]):
+            raise ValueError(f"invalid cell {data[offset:offset + 2].hex()}")
+    return data
+
+
+def pack_state(state: GameSnapshot) -> str:
+    """
+    Binary state as a network payload, base64 so any text transport
+    carries it untouched
+    """
+    return BINARY_PREFIX + base64.b64encode(encode_state(state)).decode("ascii")
+
+
+def unpack_state(payload: str) -> bytes:
+    """
+    Raw bytes of a payload made by pack_state, checked for its version
+    and for values the model can load
+    """
+    data = base64.b64decode(payload[len(BINARY_PREFIX) :], validate=True)
+    if len(data) != STATE_SIZE or data[0] != WIRE_VERSION:
+        raise ValueError(f"unsupported state encoding, version {data[:1].hex()}")
+    if not valid_turn(data[1]) or not valid_chosen(data[CHOSEN_OFFSET]):
+        raise ValueError("invalid turn or chosen cell")
+    for index in range(len(STATE_CELLS)):
+        if not valid_nibble(cell_nibble(data, index)):
+            raise ValueError(f"invalid piece code in cell {index}")
+    if int.from_bytes(data[MOVES_OFFSET:STATE_SIZE], "little") & ~FULL_BOARD:
+        raise ValueError("possible moves outside the board")
+    return data
+
+
+class ActionMessage(NamedTuple):
+    action: Action
+    player: int
+    seq: int
+    checksum: int
+
+
+def encode_action(action: Action, player: int, seq: int, key: int) -> str:
+    """
+    Action payload: prefix, kind, grid, four indexes, the sending
+    player's id, the low bits of the Zobrist key of the state right
+    after the action in hex, then their sequence number for the action
+    """
+    return (
+        f"{ACTION_PREFIX}{KIND_CODES[action.kind]}{GRID_CODES[action.gridid]}"
+        f"{action.fromi}{action.fromj}{action.toi}{action.toj}{player}"
+        f"{key & CHECKSUM_MASK:0{CHECKSUM_DIGITS}x}{seq}"
+    )
+
+
+def decode_action(payload: str) -> ActionMessage:
+    """
+    Message of a payload made by encode_action, raising ValueError when
+    it is malformed. Legality is left to the model
+    """
+    if len(payload) <= ACTION_SIZE or not payload.startswith(ACTION_PREFIX):
+        raise ValueError(f"malformed action {payload!r}")
+    body = payload[len(ACTION_PREFIX) :]
+    checksum = body[7 : 7 + CHECKSUM_DIGITS]
+    seq = body[7 + CHECKSUM_DIGITS :]
+    kind = CODE_KINDS.get(body[0])
+    if kind is None or not body[1:7].isdigit() or not seq.isdigit():
+        raise ValueError(f"malformed action {payload!r}")
+    gridid = CODE_GRIDS.get(int(body[1]))
+    if gridid is None:
+        raise ValueError(f"malformed action {payload!r}")
+    fromi, fromj, toi, toj, player = (int(char) for char in body[2:7])
+    action = Action(kind, gridid, fromi, fromj, toi, toj)
+    return ActionMessage(action, player, int(seq), int(checksum, 16))
@@ -0,0 +1,48 @@
+import random
+from project_types import PieceID, Team
+from bitboard import Bitboards, BOARD_ROWS, BOARD_COLS, CAPTURED_SLOTS, cells
+
+# Fixed seed so every process, and both clients, agree on the keys
+_rng = random.Random(0x5C0C0)
+
+TEAMS = (Team.Player1, Team.Player2)
+
+BOARD_KEYS: dict[tuple[PieceID, Team], list[int]] = {
+    (pieceid, team): [_rng.getrandbits(64) for _ in range(BOARD_ROWS * BOARD_COLS)]
+    for pieceid in PieceID
+    for team in TEAMS
+}
+CAPTURED_KEYS: dict[tuple[Team, int, PieceID], int] = {
+    (team, slot, pieceid): _rng.getrandbits(64)
+    for team in TEAMS
+    for slot in range(CAPTURED_SLOTS)
+    for pieceid in PieceID
+}
+PLAYER_KEYS: dict[Team, int] = {team: _rng.getrandbits(64) for team in TEAMS}
+MOVES_LEFT_KEYS: list[int] = [_rng.getrandbits(64) for _ in range(4)]
+
+
+def board_key(pieceid: PieceID, team: Team, i: int, j: int) -> int:
+    return BOARD_KEYS[(pieceid, team)][i * BOARD_COLS + j]
+
+
+def turn_key(curr_player: Team, moves_left: int) -> int:
+    return PLAYER_KEYS[curr_player] ^ MOVES_LEFT_KEYS[moves_left]
+
+
+def hash_pieces(bitboards: Bitboards) -> int:
+    """
+    Zobrist key of the board and captured grids computed from scratch
+    """
+    key = 0
+    for team in TEAMS:
+        own = bitboards.teams[team]
+        for pieceid in PieceID:
+            keys = BOARD_KEYS[(pieceid, team)]
+            for i, j in cells(bitboards.pieces[pieceid] & own):
+                key ^= keys[i * BOARD_COLS + j]
+        for slot in range(CAPTURED_SLOTS):
+            pieceid = bitboards.captured_at(team, slot)
+            if pieceid is not None:
+                key ^= CAPTURED_KEYS[(team, slot, pieceid)]
+    return key
@@ -0,0 +1,101 @@
+import random
+from engine import Playout
+from model import GameModel
+from project_types import Action, Team
+
+PlayoutPosition = tuple[
+    list[int], list[int], int, list[list[int]], int, int, Team | None
+]
+
+
+class CountingRandom(random.Random):
+    """
+    Remembers how many options the last randrange call chose from
+    """
+
+    options = 0
+
+    def randrange(self, *args: int, **kwargs: int) -> int:  # type: ignore[override]
+        self.options = args[0]
+        return super().randrange(*args, **kwargs)
+
+
+def position(playout: Playout) -> PlayoutPosition:
+    """
+    Everything a playout decides on; captured pieces as a multiset,
+    since GameModel refills freed slots while Playout appends
+    """
+    return (
+        list(playout.kinds),
+        list(playout.teams),
+        playout.summoners,
+        [sorted(captured) for captured in playout.captured],
+        playout.curr,
+        playout.moves_left,
+        playout.winner,
+    )
+
+
+def matching_actions(model: GameModel, target: PlayoutPosition) -> list[Action]:
+    """
+    Legal actions of model that lead to the target playout position
+    """
+    matches: list[Action] = []
+    for action in model.legal_actions():
+        record = model.make(action)
+        if position(Playout(model)) == target:
+            matches.append(action)
+        model.unmake(record)
+    return matches
+
+
+def test_playout_follows_game_model():
+    """
+    A Playout stepped alongside a GameModel offers exactly as many
+    actions as legal_actions, and every step it takes is one of them
+    """
+    rng = CountingRandom(2024)
+    plies = 0
+    for _ in range(12):
+        model = GameModel()
+        playout = Playout(model)
+        for _ in range(250):
+            if model.state.winner is not None:
+                break
+            legal = len(model.legal_actions())
+            rng.options = 0
+            stepped = playout.step(rng)
+            assert stepped == (legal > 0)
+            if not stepped:
+                break
+            assert rng.options == legal
+
+            matches = matching_actions(model, position(playout))
+            assert matches, "playout reached a position make cannot"
+            model.make(matches[0])
+            assert position(Playout(model)) == position(playout)
+            plies += 1
+        assert playout.winner == model.state.winner
+    assert plies > 1000
+
+
+def test_playout_matches_positions_read_mid_game():
+    """
+    Building a Playout from any position agrees with the model's
+    action count and turn state
+    """
+    rng = random.Random(7)
+    counting = CountingRandom(1)
+    for _ in range(150):
+        model = GameModel()
+        for _ in range(rng.randrange(150)):
+            actions = model.legal_actions()
+            if not actions or model.state.winner is not None:
+                break
+            model.make(rng.choice(actions))
+        if model.state.winner is not None:
+            continue
+        playout = Playout(model)
+        counting.options = 0
+        playout.step(counting)
+        assert counting.options == len(model.legal_actions())
@@ -0,0 +1,236 @@
+import random
+from typing import cast
+from controller import MOVES_PER_TURN, GameController
+from model import GameModel, Slime
+from project_types import Action, GameSnapshot, GridID, Location, Team
+from view import GameView
+from wire import (
+    ACTION_PREFIX,
+    BINARY_PREFIX,
+    DIFF_PREFIX,
+    STATE_REQUEST,
+    TEXT_PREFIX,
+    decode_action,
+    encode_action,
+    state_request,
+)
+
+TEAMS = {1: Team.Player1, 2: Team.Player2}
+
+
+class Relay:
+    """
+    The course relay: one ordered stream of (src, payload) that every
+    client reads in full, its own messages included
+    """
+
+    def __init__(self):
+        self.messages: list[tuple[int, str]] = []
+
+
+class RelayView:
+    """
+    Stands in for GameView: sends through the relay and dispatches what
+    it reads the same way GameView._handle_message does
+    """
+
+    def __init__(self, player_id: int, relay: Relay):
+        self._player_id = player_id
+        self._relay = relay
+        self.cursor = 0
+
+    @property
+    def playerid(self) -> Team:
+        return TEAMS[self._player_id]
+
+    def send_action(self, action: Action, seq: int, key: int):
+        payload = encode_action(action, self._player_id, seq, key)
+        self._relay.messages.append((self._player_id, payload))
+
+    def send_state_request(self, state: GameSnapshot | None = None):
+        self._relay.messages.append((self._player_id, state_request(state)))
+
+    def send_state(self, payload: str):
+        self._relay.messages.append((self._player_id, payload))
+
+    def on_state_change(self, state: GameSnapshot):
+        pass
+
+    def wake(self):
+        pass
+
+    def pending(self) -> bool:
+        return self.cursor < len(self._relay.messages)
+
+    def deliver(self, controller: GameController):
+        src, payload = self._relay.messages[self.cursor]
+        self.cursor += 1
+        own = src == self._player_id
+        if payload.startswith(STATE_REQUEST):
+            if own:
+                controller.on_state_request_echo()
+            else:
+                controller.on_state_request(payload)
+        elif payload[0] in (TEXT_PREFIX, BINARY_PREFIX, DIFF_PREFIX):
+            if not own:
+                controller.initialize_p2_game(payload)
+        elif payload.startswith(ACTION_PREFIX):
+            message = decode_action(payload)
+            controller.on_action(
+                message.action, TEAMS[src], message.seq, message.checksum
+            )
+
+
+class Client:
+    def __init__(self, player_id: int, relay: Relay):
+        self.model = GameModel()
+        self.view = RelayView(player_id, relay)
+        self.controller = GameController(self.model, cast(GameView, self.view))
+
+    def play(self, action: Action):
+        """
+        The two clicks of a local action
+        """
+        controller = self.controller
+        controller.on_click(Location(action.gridid, action.fromi, action.fromj))
+        controller.on_click(Location(GridID.BOARD, action.toi, action.toj))
+
+    def deliver(self):
+        self.view.deliver(self.controller)
+
+    def deliver_all(self):
+        while self.view.pending():
+            self.deliver()
+
+
+def settle(*clients: Client):
+    while any(client.view.pending() for client in clients):
+        for client in clients:
+            client.deliver_all()
+
+
+def test_actions_after_the_echo_wait_for_the_reply():
+    """
+    An action ordered between our request and its reply is already in
+    the state the reply carries; applying it first would lose it
+    """
+    relay = Relay()
+    player1, player2 = Client(1, relay), Client(2, relay)
+    player2.controller._request_resync()  # pyright: ignore[reportPrivateUsage]
+    action = player1.model.legal_actions()[0]
+    player1.play(action)  # Before player 1 reads the request
+
+    player2.deliver()  # Echo of the request
+    player2.deliver()  # The action, ordered after the request
+    assert player2.controller._held  # pyright: ignore[reportPrivateUsage]
+    assert player2.model.state.moves_left == MOVES_PER_TURN
+
+    settle(player1, player2)
+    assert not player2.controller._held  # pyright: ignore[reportPrivateUsage]
+    assert player2.model.state.moves_left == MOVES_PER_TURN - 1
+    assert player1.model.zobrist_key == player2.model.zobrist_key
+
+
+def test_holding_stops_after_more_than_a_turn_of_opponent_actions():
+    """
+    A reply that never comes must not hold the match forever
+    """
+    relay = Relay()
+    player2 = Client(2, relay)
+    controller = player2.controller
+    controller._request_resync()  # pyright: ignore[reportPrivateUsage]
+    player2.deliver()
+    assert controller._holding  # pyright: ignore[reportPrivateUsage]
+
+    # A turn of each player, then one more opponent action
+    shadow = GameModel()
+    rng = random.Random(3)
+    opponent = 0
+    while opponent <= MOVES_PER_TURN:
+        assert controller._holding  # pyright: ignore[reportPrivateUsage]
+        sender = shadow.state.curr_player
+        action = rng.choice(shadow.legal_actions())
+        shadow.make(action)
+        controller.on_action(action, sender, 0, shadow.zobrist_key)
+        opponent += sender == Team.Player1
+
+    assert not controller._holding  # pyright: ignore[reportPrivateUsage]
+    assert not controller._held  # pyright: ignore[reportPrivateUsage]
+    assert player2.model.zobrist_key == shadow.zobrist_key
+
+
+def test_diverged_client_resyncs_from_the_next_action():
+    """
+    A checksum mismatch on an opponent action fetches the differing
+    cells, after which both clients agree again
+    """
+    relay = Relay()
+    player1, player2 = Client(1, relay), Client(2, relay)
+    player2.model._set_cell(  # pyright: ignore[reportPrivateUsage]
+        GridID.BOARD, 2, 0, Slime(2, 0, Team.Player1)
+    )
+    assert player1.model.zobrist_key != player2.model.zobrist_key
+
+    player1.play(player1.model.legal_actions()[0])
+    settle(player1, player2)
+    assert any(payload.startswith(STATE_REQUEST) for _, payload in relay.messages)
+    assert player1.model.zobrist_key == player2.model.zobrist_key
+
+
+def corrupt(model: GameModel, rng: random.Random):
+    """
+    Puts a stray slime on an empty board cell behind the controller's back
+    """
+    empty = [
+        (i, j)
+        for i, row in enumerate(model.state.board_state)
+        for j, piece in enumerate(row)
+        if piece is None
+    ]
+    i, j = rng.choice(empty)
+    model._set_cell(  # pyright: ignore[reportPrivateUsage]
+        GridID.BOARD, i, j, Slime(i, j, Team.Player1)
+    )
+
+
+def play_relay_game(rng: random.Random, diverge: bool) -> tuple[Client, Client]:
+    """
+    Both clients act and read the relay in a random interleaving,
+    player 2 joining with a state request as GameController.start does.
+    With diverge, player 2's model is corrupted once early in the game
+    """
+    relay = Relay()
+    clients = {1: Client(1, relay), 2: Client(2, relay)}
+    clients[2].controller._request_resync()  # pyright: ignore[reportPrivateUsage]
+    corrupt_at = rng.randrange(50, 150) if diverge else None
+    for step in range(2000):
+        if all(c.model.state.winner is not None for c in clients.values()):
+            break
+        client = clients[rng.choice((1, 2))]
+        state = client.model.state
+        if rng.random() < 0.4:
+            if state.winner is None and state.curr_player == client.view.playerid:
+                actions = client.model.legal_actions()
+                if actions:
+                    client.play(rng.choice(actions))
+        elif client.view.pending():
+            client.deliver()
+        if step == corrupt_at:
+            if clients[2].controller._pending:  # pyright: ignore[reportPrivateUsage]
+                corrupt_at = step + 1  # Predictions unmake onto the cells they left
+            else:
+                corrupt(clients[2].model, rng)
+    settle(clients[1], clients[2])
+    return clients[1], clients[2]
+
+
+def test_relay_games_stay_in_sync():
+    rng = random.Random(0)
+    for game in range(30):
+        player1, player2 = play_relay_game(rng, diverge=game % 2 == 1)
+        assert player1.model.zobrist_key == player2.model.zobrist_key, game
+        state1, state2 = player1.model.state, player2.model.state
+        assert (state1.curr_player, state1.moves_left) == (
+            state2.curr_player,
+            state2.moves_left,
+        )